@@ -0,0 +1,123 @@
+import os
+import argparse
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+from core.settings import (SCREEN_WIDTH, SCREEN_HEIGHT,  # noqa: E402
+                           HIT_TEST_MODE)
+from entities.duck import Duck  # noqa: E402
+from entities.flock import DuckFlock  # noqa: E402
+
+
+def make_ducks(count, seed):
+    random.seed(seed)
+    return [Duck(x=random.randint(-200, 1000),
+                 y=random.randint(50, 500),
+                 move_angle=random.randint(-30, 30),
+                 direction=random.choice(["left", "right"]))
+            for _ in range(count)]
+
+
+def make_shots(count, seed):
+    rng = random.Random(seed)
+    return [(rng.randint(0, 899), rng.randint(0, 599)) for _ in range(count)]
+
+
+def bench_linear(ducks, shots):
+    ducks = list(ducks)
+    start = time.perf_counter()
+    for x, y in shots:
+        bullet_rect = pygame.Rect(x, y, 1, 1)
+        for duck in ducks[:]:
+            if duck.check_collision(bullet_rect):
+                ducks.remove(duck)
+    return (time.perf_counter() - start) / len(shots)
+
+
+def bench_query(ducks, shots, mode="rect"):
+    HIT_TEST_MODE[0] = mode
+    flock = DuckFlock()
+    for duck in ducks:
+        flock.append(duck)
+    flock.index()
+
+    start = time.perf_counter()
+    for x, y in shots:
+        flock.collide(pygame.Rect(x, y, 1, 1))
+    return (time.perf_counter() - start) / len(shots)
+
+
+def bench_modes(ducks, shots):
+    mode = HIT_TEST_MODE[0]
+    try:
+        bench_query(ducks, shots[:1], "mask")
+        return bench_query(ducks, shots, "rect"), bench_query(ducks, shots,
+                                                              "mask")
+    finally:
+        HIT_TEST_MODE[0] = mode
+
+
+def bench_grid(ducks, shots, rebuild):
+    flock = DuckFlock()
+    for duck in ducks:
+        flock.append(duck)
+    flock.index()
+
+    elapsed = 0.0
+    for x, y in shots:
+        if rebuild:
+            flock.grid_dirty = True
+        start = time.perf_counter()
+        flock.hit(pygame.Rect(x, y, 1, 1))
+        elapsed += time.perf_counter() - start
+    return elapsed / len(shots)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare shot hit-testing: linear scan vs spatial hash")
+    parser.add_argument("--counts", type=int, nargs="+",
+                        default=[15, 1000, 50000])
+    parser.add_argument("--shots", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--masks", action="store_true",
+                        help="compare rect and pixel-mask hit tests instead")
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    if args.masks:
+        print(f"{'ducks':>8} {'rect ms':>10} {'mask ms':>10} "
+              f"{'mask us/shot':>14}")
+        for count in args.counts:
+            ducks = make_ducks(count, args.seed)
+            shots = make_shots(args.shots, args.seed)
+            rect, mask = bench_modes(ducks, shots)
+            print(f"{count:>8} {rect * 1000:>10.4f} {mask * 1000:>10.4f} "
+                  f"{(mask - rect) * 1e6:>+14.2f}")
+        pygame.quit()
+        return
+
+    print(f"{'ducks':>8} {'linear ms':>12} {'grid+rebuild ms':>16} "
+          f"{'grid ms':>10} {'query ms':>10} {'speedup':>8}")
+    for count in args.counts:
+        ducks = make_ducks(count, args.seed)
+        shots = make_shots(args.shots, args.seed)
+        linear = bench_linear(ducks, shots)
+        rebuilt = bench_grid(ducks, shots, rebuild=True)
+        indexed = bench_grid(ducks, shots, rebuild=False)
+        query = bench_query(ducks, shots)
+        print(f"{count:>8} {linear * 1000:>12.4f} {rebuilt * 1000:>16.4f} "
+              f"{indexed * 1000:>10.4f} {query * 1000:>10.4f} "
+              f"{linear / indexed:>7.1f}x")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
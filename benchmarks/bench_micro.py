@@ -0,0 +1,118 @@
+import os
+import itertools
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+from core.settings import (SCREEN_WIDTH, SCREEN_HEIGHT,  # noqa: E402
+                           HIT_TEST_MODE)
+from core.pointer import pointer  # noqa: E402
+from core.text import HudField  # noqa: E402
+from core.rng import rng  # noqa: E402
+from core.game import Game  # noqa: E402
+from entities.duck import Duck  # noqa: E402
+from entities.flock import DuckFlock  # noqa: E402
+from entities.gun import Gun  # noqa: E402
+from benchmarks.harness import measure  # noqa: E402
+
+
+def bench_duck(results, scale):
+    duck = Duck(100, 300, 10)
+    results["micro.duck_update"] = measure(duck.update, 2000 * scale)
+
+    bullet = pygame.Rect(150, 320, 1, 1)
+    results["micro.duck_check_collision"] = measure(
+        lambda: duck.check_collision(bullet), 2000 * scale)
+
+
+def bench_hit_modes(results, scale, count=1000):
+    rng.seed(1)
+    flock = DuckFlock()
+    for _ in range(count):
+        flock.spawn(rng.randint(-100, 900), rng.randint(50, 500),
+                    rng.randint(-30, 30))
+    shots = itertools.cycle([pygame.Rect(rng.randint(0, 899),
+                                         rng.randint(0, 599), 1, 1)
+                             for _ in range(256)])
+    rng.reset()
+    flock.index()
+
+    mode = HIT_TEST_MODE[0]
+    try:
+        for name in ("rect", "mask"):
+            HIT_TEST_MODE[0] = name
+            results[f"micro.hit_{name}_{count}"] = measure(
+                lambda: flock.collide(next(shots)), 200 * scale)
+    finally:
+        HIT_TEST_MODE[0] = mode
+        flock.clear()
+
+
+def bench_flock_draw(results, scale, screen, counts=(15, 500, 5000)):
+    for count in counts:
+        rng.seed(1)
+        flock = DuckFlock()
+        for _ in range(count):
+            flock.spawn(rng.randint(0, 780), rng.randint(0, 500),
+                        rng.randint(-30, 30))
+        rng.reset()
+        number = max(10, 100 * scale * 15 // count)
+        results[f"micro.flock_draw_{count}"] = measure(
+            lambda: flock.draw(screen), number)
+        flock.clear()
+
+
+def bench_gun(results, scale, screen):
+    gun = Gun()
+    sweep = [(x, 300) for x in range(0, 900, 7)]
+    positions = itertools.cycle(sweep)
+
+    def draw():
+        pointer.pos = next(positions)
+        gun.draw(screen)
+
+    pointer.scripted = True
+    try:
+        results["micro.gun_draw_cold"] = measure(
+            draw, len(sweep), setup=gun.rotations.sprites.clear)
+        for _ in sweep:
+            draw()
+        results["micro.gun_draw_warm"] = measure(draw, 200 * scale)
+    finally:
+        pointer.scripted = False
+
+
+def bench_hud(results, scale, screen):
+    field = HudField((360, 659), 31, 'white')
+    counter = itertools.count()
+    results["micro.hud_changing"] = measure(
+        lambda: field.draw(screen, f"{next(counter) / 10:.1f}"), 200 * scale)
+    results["micro.hud_static"] = measure(
+        lambda: field.draw(screen, "12.3"), 200 * scale)
+
+
+def bench_scene_manager(results, scale):
+    with Game(headless=True, seed=1) as game:
+        manager = game.scene_manager
+        manager.set_scene("game")
+        for i in range(15):
+            manager.active_scene.ducks.spawn(60 * i, 100 + 20 * i, 10)
+        manager.draw(game.screen)
+        results["micro.scene_update"] = measure(
+            lambda: manager.update([]), 100 * scale)
+        results["micro.scene_draw"] = measure(
+            lambda: manager.draw(game.screen), 100 * scale)
+
+
+def run(scale=1):
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    results = {}
+    bench_duck(results, scale)
+    bench_hit_modes(results, scale)
+    bench_flock_draw(results, scale, screen)
+    bench_gun(results, scale, screen)
+    bench_hud(results, scale, screen)
+    bench_scene_manager(results, scale)
+    return results
@@ -0,0 +1,49 @@
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from core.settings import DIFFICULTY_LEVEL  # noqa: E402
+from core.rng import rng  # noqa: E402
+from core.game import Game  # noqa: E402
+
+MODES = ("game", "ammo", "time")
+DUCK_COUNTS = (15, 100, 500)
+DIFFICULTIES = (0, 2)
+
+
+def run_session(mode, ducks, difficulty, frames, seed=1):
+    level = DIFFICULTY_LEVEL[0]
+    DIFFICULTY_LEVEL[0] = difficulty
+    try:
+        with Game(headless=True, seed=seed) as game:
+            game.scene_manager.set_scene(mode)
+            scene = game.scene_manager.active_scene
+            for _ in range(ducks):
+                left = rng.choice([True, False])
+                scene.ducks.spawn(rng.randint(-100, 0) if left
+                                  else rng.randint(900, 1000),
+                                  rng.randint(100, 500),
+                                  rng.randint(-30, 30),
+                                  "left" if left else "right")
+
+            start = time.perf_counter()
+            game.simulate(frames)
+            elapsed = (time.perf_counter() - start) * 1000
+    finally:
+        DIFFICULTY_LEVEL[0] = level
+    return {"ms": elapsed / frames, "min": elapsed / frames,
+            "number": frames, "repeat": 1}
+
+
+def run(scale=1, modes=MODES, counts=DUCK_COUNTS,
+        difficulties=DIFFICULTIES):
+    results = {}
+    for mode in modes:
+        for ducks in counts:
+            for difficulty in difficulties:
+                name = f"macro.{mode}.ducks{ducks}.level{difficulty}"
+                results[name] = run_session(mode, ducks, difficulty,
+                                            150 * scale)
+    return results
@@ -0,0 +1,53 @@
+import json
+import platform
+import statistics
+import time
+
+import pygame
+
+DEFAULT_TOLERANCE = 0.25
+
+
+def measure(func, number=1000, repeat=5, setup=None):
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) * 1000 / number)
+    return {"ms": statistics.median(samples), "min": min(samples),
+            "number": number, "repeat": repeat}
+
+
+def metadata():
+    return {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def write_results(results, path):
+    with open(path, "w") as file:
+        json.dump({"meta": metadata(), "results": results}, file,
+                  indent=1, sort_keys=True)
+
+
+def load_results(path):
+    with open(path) as file:
+        return json.load(file)["results"]
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    regressions = []
+    for name, stored in sorted(baseline.items()):
+        current = results.get(name)
+        if current is None:
+            continue
+        limit = stored.get("threshold", stored["ms"] * (1 + tolerance))
+        if current["ms"] > limit:
+            regressions.append((name, current["ms"], limit))
+    return regressions
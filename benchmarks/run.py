@@ -0,0 +1,47 @@
+import sys
+import argparse
+
+from benchmarks import bench_micro, bench_sessions
+from benchmarks.harness import (DEFAULT_TOLERANCE, compare, load_results,
+                                write_results)
+
+SUITES = {"micro": bench_micro.run, "macro": bench_sessions.run}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the simulation and render benchmarks")
+    parser.add_argument("--suite", choices=("micro", "macro", "all"),
+                        default="all")
+    parser.add_argument("--scale", type=int, default=1,
+                        help="multiply iteration and frame counts")
+    parser.add_argument("--out", metavar="PATH",
+                        help="write results as JSON")
+    parser.add_argument("--baseline", metavar="PATH",
+                        help="fail if a result is slower than the stored "
+                             "threshold, or the stored time plus tolerance")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, run in SUITES.items():
+        if args.suite in (name, "all"):
+            results.update(run(args.scale))
+
+    for name, result in sorted(results.items()):
+        print(f"{name:<36}{result['ms']:>10.4f} ms")
+    if args.out:
+        write_results(results, args.out)
+
+    if args.baseline:
+        regressions = compare(results, load_results(args.baseline),
+                              args.tolerance)
+        for name, value, limit in regressions:
+            print(f"REGRESSION {name}: {value:.4f} ms > {limit:.4f} ms")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+import io
+import os
+import sys
+import mmap
+import zlib
+import struct
+import argparse
+import pygame
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MAGIC = b"DHPK"
+VERSION = 1
+HEADER = struct.Struct("<4sHI")
+ENTRY = struct.Struct("<HBIIQQI")
+
+FILE, RGBA, RGB = 0, 1, 2
+IMAGE_EXTENSIONS = (".png", ".jpg", ".bmp")
+RAW_LIMIT = 1 << 20
+
+
+def resource_path(path):
+    return path if os.path.isabs(path) else os.path.join(ROOT, path)
+
+
+def _encode(path, raw_limit):
+    with open(resource_path(path), "rb") as file:
+        data = file.read()
+    if not path.endswith(IMAGE_EXTENSIONS):
+        return FILE, 0, 0, data
+
+    surface = pygame.image.load(io.BytesIO(data), path)
+    width, height = surface.get_size()
+    opaque = not surface.get_flags() & pygame.SRCALPHA
+    mode, kind = ("RGB", RGB) if opaque else ("RGBA", RGBA)
+    if width * height * len(mode) > raw_limit:
+        return FILE, width, height, data
+    return kind, width, height, pygame.image.tobytes(surface, mode)
+
+
+def build(paths, target, raw_limit=RAW_LIMIT):
+    entries = []
+    blobs = []
+    for path in sorted(paths):
+        kind, width, height, data = _encode(path, raw_limit)
+        entries.append((path.encode("utf-8"), kind, width, height,
+                        len(data), zlib.crc32(data)))
+        blobs.append(data)
+
+    offset = HEADER.size + sum(ENTRY.size + len(entry[0])
+                               for entry in entries)
+    with open(target, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(entries)))
+        for name, kind, width, height, length, crc in entries:
+            file.write(ENTRY.pack(len(name), kind, width, height,
+                                  offset, length, crc))
+            file.write(name)
+            offset += length
+        for data in blobs:
+            file.write(data)
+    return len(entries)
+
+
+def asset_files(directory="assets"):
+    paths = []
+    for folder, _, files in os.walk(resource_path(directory)):
+        for name in files:
+            path = os.path.relpath(os.path.join(folder, name), ROOT)
+            paths.append(path.replace(os.sep, "/"))
+    return paths
+
+
+class AssetPack:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.buffer)
+        self.entries = {}
+
+        magic, version, count = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} asset pack")
+        position = HEADER.size
+        for _ in range(count):
+            (length, kind, width, height,
+             offset, size, crc) = ENTRY.unpack_from(self.buffer, position)
+            position += ENTRY.size
+            name = bytes(self.buffer[position:position + length])
+            position += length
+            self.entries[name.decode("utf-8")] = (
+                kind, width, height, offset, size, crc)
+
+    def __contains__(self, path):
+        return path in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def data(self, path):
+        kind, width, height, offset, size, crc = self.entries[path]
+        return self.view[offset:offset + size]
+
+    def file(self, path):
+        return io.BytesIO(self.data(path))
+
+    def image(self, path):
+        kind, width, height = self.entries[path][:3]
+        if kind == FILE:
+            return pygame.image.load(self.file(path), path)
+        mode = "RGBA" if kind == RGBA else "RGB"
+        return pygame.image.frombuffer(self.data(path), (width, height), mode)
+
+    def verify(self):
+        return [path for path, entry in self.entries.items()
+                if zlib.crc32(self.data(path)) != entry[-1]]
+
+    def close(self):
+        self.view.release()
+        self.buffer.close()
+
+
+def open_pack(path):
+    path = resource_path(path)
+    if not os.path.exists(path):
+        return None
+    return AssetPack(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.assetpack",
+                                     description="Build or check the "
+                                                 "packed asset archive")
+    parser.add_argument("command", choices=("build", "verify", "list"))
+    parser.add_argument("--pack", default="assets.pack",
+                        help="archive path, relative to the game directory")
+    parser.add_argument("--raw-limit", type=int, default=RAW_LIMIT,
+                        help="largest image, in bytes, stored as raw pixels")
+    args = parser.parse_args(argv)
+    target = resource_path(args.pack)
+
+    if args.command == "build":
+        count = build(asset_files(), target, args.raw_limit)
+        print(f"packed {count} assets into {target} "
+              f"({os.path.getsize(target) / 2 ** 20:.1f} MB)")
+        return 0
+
+    pack = AssetPack(target)
+    if args.command == "list":
+        for path, (kind, width, height, _, size, _) in pack.entries.items():
+            label = ("file", "rgba", "rgb")[kind]
+            print(f"{path:<40}{label:>5} {width:>4}x{height:<4}{size:>10}")
+        return 0
+
+    missing = [path for path in asset_files() if path not in pack]
+    corrupt = pack.verify()
+    for path in missing:
+        print(f"missing: {path}")
+    for path in corrupt:
+        print(f"corrupt: {path}")
+    print(f"{len(pack)} assets, {len(missing)} missing, "
+          f"{len(corrupt)} corrupt")
+    return 1 if missing or corrupt else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+import time
+import pygame
+from collections import OrderedDict
+from core.settings import ASSET_PACK
+from core.assetpack import open_pack, resource_path
+
+
+class AssetRegistry:
+    def __init__(self, max_scaled=512, pack=None):
+        self.max_scaled = max_scaled
+        self.pack = pack
+        self.images = {}
+        self.scaled_images = OrderedDict()
+        self.masks = {}
+        self.decode_ms = 0.0
+
+    def image(self, path):
+        surface = self.images.get(path)
+        if surface is None:
+            start = time.perf_counter()
+            surface = self.install(path, self.decode(path))
+            self.decode_ms += (time.perf_counter() - start) * 1000
+        return surface
+
+    def decode(self, path):
+        if self.pack is not None and path in self.pack:
+            return self.pack.image(path)
+        return pygame.image.load(resource_path(path))
+
+    def source(self, path):
+        if self.pack is not None and path in self.pack:
+            return self.pack.file(path)
+        return resource_path(path)
+
+    def install(self, path, surface):
+        if path not in self.images:
+            self.images[path] = surface.convert_alpha()
+        return self.images[path]
+
+    def scaled(self, path, size):
+        key = (path, (int(size[0]), int(size[1])))
+        surface = self.scaled_images.get(key)
+        if surface is not None:
+            self.scaled_images.move_to_end(key)
+            return surface
+
+        surface = pygame.transform.scale(self.image(path), key[1])
+        self.scaled_images[key] = surface
+        if len(self.scaled_images) > self.max_scaled:
+            evicted, _ = self.scaled_images.popitem(last=False)
+            self.masks.pop(evicted, None)
+        return surface
+
+    def mask(self, path, size):
+        key = (path, (int(size[0]), int(size[1])))
+        mask = self.masks.get(key)
+        if mask is None:
+            mask = pygame.mask.from_surface(self.scaled(path, size))
+            self.masks[key] = mask
+        return mask
+
+    def stats(self):
+        return {"images": len(self.images),
+                "scaled": len(self.scaled_images),
+                "masks": len(self.masks)}
+
+    def clear(self):
+        self.images.clear()
+        self.scaled_images.clear()
+        self.masks.clear()
+        self.decode_ms = 0.0
+
+
+assets = AssetRegistry(pack=open_pack(ASSET_PACK))
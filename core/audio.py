@@ -0,0 +1,33 @@
+import pygame
+from core.settings import AUDIO_ENABLED
+from core.assets import assets
+
+
+class NullSound:
+    def play(self, *args, **kwargs):
+        pass
+
+    def stop(self):
+        pass
+
+    def set_volume(self, value):
+        pass
+
+
+sounds = {}
+
+
+def load_sound(path, source=None):
+    if not AUDIO_ENABLED[0]:
+        return NullSound()
+
+    sound = sounds.get(path)
+    if sound is None:
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            sound = pygame.mixer.Sound(source or assets.source(path))
+        except pygame.error:
+            return NullSound()
+        sounds[path] = sound
+    return sound
@@ -0,0 +1,205 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+from core.settings import DIFFICULTY_LEVEL, TICK_RATE  # noqa: E402
+from core.clock import game_clock  # noqa: E402
+from core.game import Game  # noqa: E402
+
+MODES = ("game", "ammo", "time")
+DIFFICULTIES = (0, 1, 2)
+BOTS = {
+    "casual": {"interval": 45, "reaction": 8, "jitter": 20},
+    "skilled": {"interval": 25, "reaction": 3, "jitter": 8},
+    "perfect": {"interval": 15, "reaction": 0, "jitter": 0},
+}
+FREE_PLAY_SECONDS = 60
+
+
+class AimBot:
+    def __init__(self, seed, interval, reaction, jitter):
+        self.random = random.Random(seed)
+        self.interval = interval
+        self.reaction = reaction
+        self.jitter = jitter
+        self.hits = 0
+        self.target_born = None
+        self.kill_ms = []
+
+    def aim(self, duck):
+        x, y = duck.position_at(-self.reaction)
+        x += (duck.size + 20) / 2 + self.random.gauss(0, self.jitter)
+        y += duck.size / 2 + self.random.gauss(0, self.jitter)
+        return int(x), int(y)
+
+    def __call__(self, frame, game):
+        scene = game.scene_manager.active_scene
+        if game.mode:
+            hits = game.scene_manager.scenes[game.mode].hits_count
+            if hits > self.hits and self.target_born is not None:
+                self.kill_ms.append(game_clock.get_ticks() - self.target_born)
+            self.hits = hits
+        self.target_born = None
+
+        if game.scene_manager.active_name == "score":
+            game.running = False
+            return []
+
+        ducks = getattr(scene, "ducks", None)
+        if not ducks or frame % self.interval:
+            return []
+        visible = [duck for duck in ducks
+                   if 0 <= duck.x < 900 - duck.size and 0 <= duck.y < 600]
+        if not visible:
+            return []
+
+        duck = self.random.choice(visible)
+        self.target_born = duck.born
+        pos = self.aim(duck)
+        return [pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0),
+                                   buttons=(0, 0, 0)),
+                pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1,
+                                   pos=pos)]
+
+
+def run_session(job):
+    mode, difficulty, bot_name, seed = job
+    level = DIFFICULTY_LEVEL[0]
+    DIFFICULTY_LEVEL[0] = difficulty
+    try:
+        with Game(headless=True, seed=seed) as game:
+            game.scene_manager.set_scene(mode)
+            scene = game.scene_manager.active_scene
+            bot = AimBot(seed, **BOTS[bot_name])
+            game.simulate(FREE_PLAY_SECONDS * TICK_RATE + 1, script=bot,
+                          render=False)
+            duration = (game_clock.get_ticks() - scene.start_time) / 1000
+    finally:
+        DIFFICULTY_LEVEL[0] = level
+
+    shots = scene.shots_count
+    return {
+        "mode": mode, "difficulty": difficulty, "bot": bot_name,
+        "seed": seed, "score": scene.score, "hits": scene.hits_count,
+        "shots": shots,
+        "accuracy": scene.hits_count / shots if shots else 0.0,
+        "duration": duration,
+        "kill_seconds": [ms / 1000 for ms in bot.kill_ms],
+    }
+
+
+def jobs(runs, seed, modes=MODES, difficulties=DIFFICULTIES, bots=BOTS):
+    seeds = random.Random(seed)
+    return [(mode, difficulty, bot, seeds.randrange(2 ** 32))
+            for mode in modes for difficulty in difficulties
+            for bot in bots for _ in range(runs)]
+
+
+def run_all(job_list, workers=None):
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [run_session(job) for job in job_list]
+    chunksize = max(1, len(job_list) // (workers * 4))
+    with ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(run_session, job_list,
+                                 chunksize=chunksize))
+
+
+def distribution(values):
+    if not values:
+        return None
+    values = sorted(values)
+    last = len(values) - 1
+    return {
+        "mean": statistics.fmean(values),
+        "p10": values[last * 10 // 100],
+        "median": values[last // 2],
+        "p90": values[last * 90 // 100],
+    }
+
+
+def aggregate(runs):
+    groups = {}
+    for run in runs:
+        key = (run["mode"], run["difficulty"], run["bot"])
+        groups.setdefault(key, []).append(run)
+
+    report = []
+    for (mode, difficulty, bot), group in sorted(groups.items()):
+        report.append({
+            "mode": mode, "difficulty": difficulty, "bot": bot,
+            "runs": len(group),
+            "score": distribution([run["score"] for run in group]),
+            "accuracy": distribution([run["accuracy"] for run in group]),
+            "duration": distribution([run["duration"] for run in group]),
+            "kill_seconds": distribution(
+                [value for run in group for value in run["kill_seconds"]]),
+        })
+    return report
+
+
+def format_report(report):
+    lines = [f"{'mode':<6}{'level':>6} {'bot':<9}{'runs':>6}"
+             f"{'score':>9}{'p10':>7}{'p90':>7}{'acc':>7}{'ttk':>7}"]
+    for row in report:
+        score = row["score"]
+        kill = row["kill_seconds"]
+        lines.append(
+            f"{row['mode']:<6}{row['difficulty']:>6} {row['bot']:<9}"
+            f"{row['runs']:>6}{score['median']:>9}{score['p10']:>7}"
+            f"{score['p90']:>7}{row['accuracy']['mean']:>7.2f}"
+            f"{kill['median'] if kill else 0:>7.2f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.balance",
+                                     description="Play headless sessions "
+                                                 "with aiming bots and "
+                                                 "report score statistics")
+    parser.add_argument("--runs", type=int, default=100,
+                        help="sessions per mode, difficulty and bot")
+    parser.add_argument("--seed", type=int, default=1,
+                        help="seed that the per-run seeds are drawn from")
+    parser.add_argument("--workers", type=int,
+                        help="worker processes (default: one per core)")
+    parser.add_argument("--mode", action="append", choices=MODES)
+    parser.add_argument("--difficulty", action="append", type=int,
+                        choices=DIFFICULTIES)
+    parser.add_argument("--bot", action="append", choices=sorted(BOTS))
+    parser.add_argument("--out", metavar="PATH",
+                        help="write the aggregated report as JSON")
+    parser.add_argument("--runs-out", metavar="PATH",
+                        help="write every session's result as JSON")
+    args = parser.parse_args(argv)
+
+    job_list = jobs(args.runs, args.seed, args.mode or MODES,
+                    args.difficulty or DIFFICULTIES, args.bot or BOTS)
+    start = time.perf_counter()
+    runs = run_all(job_list, args.workers)
+    elapsed = time.perf_counter() - start
+    report = aggregate(runs)
+
+    print(format_report(report))
+    print(f"{len(runs)} sessions in {elapsed:.1f}s "
+          f"({len(runs) / elapsed:.1f} sessions/s)")
+    if args.out:
+        with open(args.out, "w") as file:
+            json.dump({"seed": args.seed, "report": report}, file, indent=1)
+    if args.runs_out:
+        with open(args.runs_out, "w") as file:
+            json.dump(runs, file, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
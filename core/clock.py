@@ -0,0 +1,32 @@
+import pygame
+
+REFERENCE_TICK_MS = 1000 / 60
+
+
+class GameClock:
+    def __init__(self):
+        self.simulated = False
+        self.time_ms = 0.0
+        self.tick_ms = REFERENCE_TICK_MS
+        self.alpha = 1.0
+
+    @property
+    def dt(self):
+        return self.tick_ms / REFERENCE_TICK_MS
+
+    def get_ticks(self):
+        if self.simulated:
+            return int(self.time_ms)
+        return pygame.time.get_ticks()
+
+    def advance(self, ms):
+        self.time_ms += ms
+
+    def save(self):
+        return self.simulated, self.time_ms, self.tick_ms, self.alpha
+
+    def restore(self, state):
+        self.simulated, self.time_ms, self.tick_ms, self.alpha = state
+
+
+game_clock = GameClock()
@@ -0,0 +1,38 @@
+import pygame
+
+BUTTON_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+KEY_EVENTS = (pygame.KEYDOWN, pygame.KEYUP)
+
+
+def event_code(event):
+    if event.type in BUTTON_EVENTS:
+        return event.button
+    if event.type in KEY_EVENTS:
+        return event.key
+    return None
+
+
+def coalesce(events):
+    last = len(events) - 1
+    return [event for i, event in enumerate(events)
+            if event.type != pygame.MOUSEMOTION
+            or i == last or events[i + 1].type != pygame.MOUSEMOTION]
+
+
+class EventDispatcher:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event_type, handler, code=None):
+        self.handlers[(event_type, code)] = handler
+
+    def event_types(self):
+        return {event_type for event_type, _ in self.handlers}
+
+    def dispatch(self, events):
+        handlers = self.handlers
+        for event in coalesce(events):
+            handler = (handlers.get((event.type, event_code(event)))
+                       or handlers.get((event.type, None)))
+            if handler is not None:
+                handler(event)
@@ -1,6 +1,26 @@
+import os
+import time
+import random
+import logging
 import pygame
-from core.settings import SCREEN_HEIGHT, SCREEN_WIDTH, FPS, BG_COLOR
+from core.settings import (SCREEN_HEIGHT, SCREEN_WIDTH, FPS, AUDIO_ENABLED,
+                           TICK_RATE, MAX_TICKS_PER_FRAME, DIRTY_RECT_COLOR,
+                           PRELOAD_SCENES, ASYNC_ASSETS, DIFFICULTY_LEVEL)
 from core.scene_manager import SceneManager
+from core.clock import game_clock
+from core.pointer import pointer
+from core.profiler import FrameProfiler, ProfilerOverlay
+from core.assets import assets
+from core.text import text_renderer
+from core.startup import startup_timer
+from core.loader import AssetLoader
+from core.rng import rng
+from core.replay import Replay
+from core.results import results
+from core.assetpack import resource_path
+from entities.gun import rotation_caches
+from entities.duck import cull_stats
+from entities.duck_pool import duck_pool
 from scenes.menu_scene import MenuScene
 from scenes.free_gamemode_scene import GameScene
 from scenes.pause_scene import PauseScene
@@ -8,49 +28,361 @@ from scenes.score_scene import ScoreScene
 from scenes.settings_scene import SettingsMenu
 from scenes.limited_ammo_gamemode_scene import LimitedAmmoGameModeScene
 from scenes.limited_time_gamemode_scene import LimitedTimeGameModeScene
+from scenes.loading_scene import LoadingScene
+
+logger = logging.getLogger(__name__)
+
+SCENES = {
+    "menu": MenuScene,
+    "pause": PauseScene,
+    "game": GameScene,
+    "ammo": LimitedAmmoGameModeScene,
+    "time": LimitedTimeGameModeScene,
+    "score": ScoreScene,
+    "settings": SettingsMenu,
+}
+
+REDRAW_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED,
+                 pygame.WINDOWSHOWN, pygame.WINDOWRESTORED,
+                 pygame.WINDOWMAXIMIZED, pygame.WINDOWSIZECHANGED)
+BASE_EVENTS = (pygame.QUIT, pygame.KEYDOWN) + REDRAW_EVENTS
+POINTER_EVENTS = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN,
+                  pygame.MOUSEBUTTONUP)
 
 
 class Game:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("CI/CD Duck Hunt")
-
-        self.scene_manager = SceneManager()
-        self.scene_manager.add_scene("menu",
-                                     MenuScene(self.scene_manager))
-        self.scene_manager.add_scene("pause",
-                                     PauseScene(self.scene_manager))
-        self.scene_manager.add_scene("game",
-                                     GameScene(self.scene_manager))
-        self.scene_manager.add_scene("ammo",
-                                     LimitedAmmoGameModeScene(
-                                         self.scene_manager))
-        self.scene_manager.add_scene("time",
-                                     LimitedTimeGameModeScene(
-                                         self.scene_manager))
-        self.scene_manager.add_scene("score",
-                                     ScoreScene(self.scene_manager))
-        self.scene_manager.add_scene("settings",
-                                     SettingsMenu(self.scene_manager))
-        self.scene_manager.set_scene("menu")
+    def __init__(self, headless=False, tick_rate=TICK_RATE,
+                 profile_path=None, async_assets=None, seed=None,
+                 record_path=None, stats_path=None):
+        self.saved_state = (rng.save(), game_clock.save())
+        self.headless = headless
+        self.tick_ms = 1000 / tick_rate
+        self.profile_path = profile_path
+        self.record_path = record_path
+        self.stats_path = stats_path
+        self.seed = seed = self._seed_session(seed, record_path)
+        self.replay = (Replay(seed, DIFFICULTY_LEVEL[0], int(tick_rate))
+                       if record_path else None)
+        self.ticks = 0
+        self.mode = None
+        self.result = None
+        if seed is not None:
+            self._start_clock()
+        if headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
+            if (pygame.display.get_init()
+                    and pygame.display.get_driver() != "dummy"):
+                pygame.display.quit()
+            AUDIO_ENABLED[0] = False
+
+        with startup_timer.measure("pygame.init"):
+            pygame.init()
+        with startup_timer.measure("display"):
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH,
+                                                   SCREEN_HEIGHT))
+            pygame.display.set_caption("CI/CD Duck Hunt")
+
+        self.profiler = FrameProfiler()
+        self.profiler_overlay = ProfilerOverlay(self.profiler)
+        self.show_profiler = False
+
+        base_events = BASE_EVENTS
+        if record_path:
+            base_events += POINTER_EVENTS
+        self.scene_manager = SceneManager(self.profiler, base_events)
+        for name, factory in SCENES.items():
+            self.scene_manager.register(name, factory)
+
+        if async_assets is None:
+            async_assets = ASYNC_ASSETS and not headless and not record_path
+        self.loader = AssetLoader() if async_assets else None
+        if self.loader:
+            for factory in SCENES.values():
+                self.loader.request_many(factory.ASSETS)
+            self.scene_manager.register(
+                "loading", lambda manager: LoadingScene(
+                    manager, self.loader, MenuScene.ASSETS, "menu"))
+            self.scene_manager.set_scene("loading")
+        else:
+            self.scene_manager.set_scene("menu")
 
         self.clock = pygame.time.Clock()
         self.running = True
+        self.show_dirty_rects = False
+        self.overlay_rects = []
+        self.preload = PRELOAD_SCENES and not record_path
+
+    def _seed_session(self, seed, record_path):
+        if record_path and seed is None:
+            seed = random.randrange(2 ** 32)
+        if seed is not None:
+            rng.seed(seed)
+        else:
+            rng.reset()
+            game_clock.simulated = False
+        return seed
+
+    def startup_report(self):
+        startup_timer.first_frame()
+        build_ms = self.scene_manager.build_ms
+        phases = startup_timer.report({
+            "asset decode": assets.decode_ms,
+            "async decode": self.loader.decode_ms if self.loader else 0.0,
+            "scene build": sum(build_ms.values()),
+        })
+        logger.info("Scenes built: %s", ", ".join(
+            f"{name} {ms:.1f} ms" for name, ms in build_ms.items()))
+        return phases
+
+    def tick(self, events):
+        if self.replay:
+            if not self.ticks:
+                self.replay.scene = self.scene_manager.active_name
+            self.replay.record(self.ticks, events, self.hit_alpha())
+        for event in events:
+            if event.type == pygame.QUIT:
+                self.running = False
+
+        if self.loader:
+            self.loader.pump()
+        self.scene_manager.update(events)
+        if hasattr(self.scene_manager.active_scene, "ducks"):
+            self.mode = self.scene_manager.active_name
+        elif self.scene_manager.active_name == "score":
+            self.result = self.session_stats()
+        self.ticks += 1
+        game_clock.advance(self.tick_ms)
+
+    def session_stats(self):
+        scene = self.scene_manager.scenes[self.mode] if self.mode else None
+        return {
+            "mode": self.mode or "",
+            "score": getattr(scene, "score", 0),
+            "hits": getattr(scene, "hits_count", 0),
+            "shots": getattr(scene, "shots_count", 0),
+        }
+
+    def hit_alpha(self):
+        ducks = getattr(self.scene_manager.active_scene, "ducks", None)
+        return 1.0 if ducks is None else ducks.drawn_alpha
+
+    def duck_count(self):
+        return len(getattr(self.scene_manager.active_scene, "ducks", ()))
+
+    def cache_stats(self):
+        images = assets.stats()
+        text = text_renderer.stats()
+        pool = duck_pool.stats()
+        stats = {
+            "ducks": self.duck_count(),
+            "assets": f"{images['images']} images, "
+                      f"{images['scaled']} scaled",
+            "text": f"{text['hits']} hits, {text['misses']} misses",
+            "pool": f"{pool['free']} free, {pool['high_water']} peak, "
+                    f"{pool['created']} created",
+            "culling": f"{cull_stats['culled']} blits skipped",
+        }
+        for cache in rotation_caches.values():
+            stats["gun"] = f"{cache.stats()['entries']} rotations"
+        return stats
+
+    def render(self):
+        start = time.perf_counter()
+        if self.show_profiler:
+            self.profiler_overlay.restore(self.screen)
+        rects = self.scene_manager.draw(self.screen)
+
+        if self.show_dirty_rects and rects:
+            for rect in rects:
+                pygame.draw.rect(self.screen, DIRTY_RECT_COLOR, rect, 1)
+            rects, self.overlay_rects = rects + self.overlay_rects, rects
+
+        if self.show_profiler:
+            rect = self.profiler_overlay.draw(
+                self.screen, self.cache_stats(),
+                self.scene_manager.active_name)
+            if rects is not None:
+                rects = rects + [rect]
+
+        presented = time.perf_counter()
+        self.profiler.add("draw", (presented - start) * 1000)
+
+        if not self.headless:
+            if rects is None:
+                pygame.display.flip()
+            elif rects:
+                pygame.display.update(rects)
+        self.profiler.add("present",
+                          (time.perf_counter() - presented) * 1000)
+        return rects
+
+    def toggle_dirty_rects(self):
+        self.show_dirty_rects = not self.show_dirty_rects
+        self.overlay_rects = []
+        self.scene_manager.invalidate()
+
+    def toggle_profiler(self):
+        self.show_profiler = not self.show_profiler
+        self.profiler_overlay.saved = None
+        self.scene_manager.invalidate()
+
+    def handle_window_events(self, events):
+        for event in events:
+            if event.type == pygame.QUIT:
+                self.running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F2:
+                self.toggle_dirty_rects()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.toggle_profiler()
+            elif event.type in REDRAW_EVENTS:
+                self.scene_manager.invalidate()
+
+    def _start_clock(self):
+        if self.seed is not None:
+            game_clock.time_ms = self.ticks * self.tick_ms
+        else:
+            game_clock.time_ms = max(game_clock.time_ms,
+                                     pygame.time.get_ticks())
+        game_clock.tick_ms = self.tick_ms
+        game_clock.simulated = True
+
+    def _stop_clock(self):
+        game_clock.simulated = self.seed is not None
+        game_clock.alpha = 1.0
 
     def run(self):
+        pointer.scripted = self.replay is not None
+        self._start_clock()
+        accumulator = 0.0
+        pending = []
+        self.clock.tick()
+        if self.stats_path:
+            results.open(resource_path(self.stats_path))
+
         while self.running:
-            self.clock.tick(FPS)
+            accumulator += min(self.clock.tick(FPS),
+                               self.tick_ms * MAX_TICKS_PER_FRAME)
+            self.profiler.begin_frame()
 
+            start = time.perf_counter()
             events = pygame.event.get()
+            self.handle_window_events(events)
+            pending.extend(events)
+            self.profiler.add("events", (time.perf_counter() - start) * 1000)
 
-            for event in events:
-                if event.type == pygame.QUIT:
-                    self.running = False
-
-            self.scene_manager.update(events)
+            start = time.perf_counter()
+            while accumulator >= self.tick_ms:
+                if pointer.scripted:
+                    pointer.feed(pending)
+                self.tick(pending)
+                pending = []
+                accumulator -= self.tick_ms
+            self.profiler.add("update", (time.perf_counter() - start) * 1000)
 
-            self.screen.fill(BG_COLOR)
-            self.scene_manager.draw(self.screen)
-            pygame.display.flip()
+            game_clock.alpha = accumulator / self.tick_ms
+            self.render()
+            if startup_timer.first_frame_ms is None:
+                if self.scene_manager.active_name != "loading":
+                    self.startup_report()
+            elif self.preload:
+                start = time.perf_counter()
+                self.scene_manager.preload(
+                    self.loader.ready if self.loader else None)
+                self.profiler.add("preload",
+                                  (time.perf_counter() - start) * 1000)
+            self.profiler.end_frame(self.duck_count())
 
+        pointer.scripted = False
+        self._stop_clock()
+        self.log_rotation_caches()
+        self.dump_profile()
+        self.save_replay()
+        results.close()
+        if self.loader:
+            self.loader.shutdown()
+        self.close()
         pygame.quit()
+
+    def close(self):
+        if self.saved_state is not None:
+            rng_state, clock_state = self.saved_state
+            rng.restore(rng_state)
+            game_clock.restore(clock_state)
+            self.saved_state = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def log_rotation_caches(self):
+        for cache in rotation_caches.values():
+            if not cache.precomputed:
+                cache.log_stats()
+
+    def dump_profile(self):
+        if self.profile_path:
+            self.profiler.dump(self.profile_path)
+            logger.info("Frame profile written to %s", self.profile_path)
+
+    def save_replay(self):
+        if self.replay:
+            self.replay.finish(self.result or self.session_stats())
+            self.replay.save(self.record_path)
+            logger.info("Replay (seed %d, %d ticks) written to %s",
+                        self.seed, self.replay.ticks, self.record_path)
+
+    def simulate(self, frames, script=None, render=True):
+        pointer.scripted = True
+        self._start_clock()
+        try:
+            frame = 0
+            while frame < frames and self.running:
+                if callable(script):
+                    events = script(frame, self)
+                elif script:
+                    events = script.get(frame, [])
+                else:
+                    events = []
+
+                self.profiler.begin_frame()
+                pointer.feed(events)
+                start = time.perf_counter()
+                self.tick(events)
+                self.profiler.add("update",
+                                  (time.perf_counter() - start) * 1000)
+                if render:
+                    self.render()
+                self.profiler.end_frame(self.duck_count())
+                frame += 1
+        finally:
+            pointer.scripted = False
+            self._stop_clock()
+            self.log_rotation_caches()
+            self.dump_profile()
+            self.save_replay()
+        return frame
+
+
+def play_replay(replay, render=False):
+    script = replay.script()
+    alphas = replay.alphas()
+
+    def feed(frame, game):
+        ducks = getattr(game.scene_manager.active_scene, "ducks", None)
+        if ducks is not None:
+            ducks.show(alphas.get(frame, 1.0))
+        return script.get(frame, [])
+
+    difficulty = DIFFICULTY_LEVEL[0]
+    DIFFICULTY_LEVEL[0] = replay.difficulty
+    try:
+        with Game(headless=True, tick_rate=replay.tick_rate,
+                  seed=replay.seed) as game:
+            game.scene_manager.set_scene(replay.scene)
+            game.simulate(replay.ticks, script=feed, render=render)
+            return game.result or game.session_stats()
+    finally:
+        DIFFICULTY_LEVEL[0] = difficulty
@@ -0,0 +1,34 @@
+import pygame
+
+
+class StaticLayerCache:
+    def __init__(self, size):
+        self.size = size
+        self.surface = None
+        self.key = None
+
+    def invalidate(self):
+        self.surface = None
+
+    def _display_key(self):
+        display = pygame.display.get_surface()
+        if display is None:
+            return None
+        return (display.get_size(), display.get_bitsize(),
+                display.get_masks())
+
+    def composite(self, layers):
+        key = (self._display_key(),
+               tuple((id(surface), pos) for surface, pos in layers))
+        if self.surface is None or key != self.key:
+            surface = pygame.Surface(self.size)
+            if key[0] is not None:
+                surface = surface.convert()
+            for layer, pos in layers:
+                surface.blit(layer, pos)
+            self.surface = surface
+            self.key = key
+        return self.surface
+
+    def draw(self, screen, layers):
+        return screen.blit(self.composite(layers), (0, 0))
@@ -0,0 +1,85 @@
+import io
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+import pygame
+from core.assets import assets
+from core.audio import load_sound
+from core.settings import ASSET_LOADER_WORKERS
+
+SOUND_EXTENSIONS = (".wav", ".ogg")
+
+
+class AssetLoader:
+    def __init__(self, registry=None, workers=ASSET_LOADER_WORKERS):
+        self.registry = registry or assets
+        self.executor = ThreadPoolExecutor(workers,
+                                           thread_name_prefix="assets")
+        self.futures = {}
+        self.pending = []
+        self.decode_ms = 0.0
+
+    def _decode(self, path):
+        start = time.perf_counter()
+        if not path.endswith(SOUND_EXTENSIONS):
+            data = self.registry.decode(path)
+        else:
+            data = self.registry.source(path)
+            if isinstance(data, str):
+                with open(data, "rb") as file:
+                    data = io.BytesIO(file.read())
+        return data, (time.perf_counter() - start) * 1000
+
+    def request(self, path):
+        future = self.futures.get(path)
+        if future is None:
+            future = self.futures[path] = Future()
+            if path in self.registry.images:
+                future.set_result(self.registry.images[path])
+            else:
+                self.pending.append(
+                    (path, self.executor.submit(self._decode, path), future))
+        return future
+
+    def request_many(self, paths):
+        return [self.request(path) for path in paths]
+
+    def _install(self, path, data):
+        if path.endswith(SOUND_EXTENSIONS):
+            return load_sound(path, data)
+        return self.registry.install(path, data)
+
+    def pump(self, budget_ms=4.0):
+        start = time.perf_counter()
+        installed = 0
+        waiting = []
+        for index, (path, worker, future) in enumerate(self.pending):
+            if (time.perf_counter() - start) * 1000 > budget_ms:
+                waiting.extend(self.pending[index:])
+                break
+            if not worker.done():
+                waiting.append((path, worker, future))
+                continue
+
+            try:
+                data, decode_ms = worker.result()
+                self.decode_ms += decode_ms
+                future.set_result(self._install(path, data))
+            except (OSError, pygame.error) as error:
+                future.set_exception(error)
+            installed += 1
+        self.pending = waiting
+        return installed
+
+    def wait(self):
+        wait([worker for _, worker, _ in self.pending])
+        self.pump(budget_ms=float("inf"))
+
+    def progress(self, paths):
+        done = sum(1 for path in paths if self.request(path).done())
+        return done / len(paths) if paths else 1.0
+
+    def ready(self, paths):
+        return self.progress(paths) >= 1.0
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
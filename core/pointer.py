@@ -0,0 +1,31 @@
+import pygame
+
+
+class Pointer:
+    def __init__(self):
+        self.scripted = False
+        self.pos = (0, 0)
+        self.pressed = [False, False, False]
+
+    def get_pos(self):
+        if self.scripted:
+            return self.pos
+        return pygame.mouse.get_pos()
+
+    def get_pressed(self):
+        if self.scripted:
+            return tuple(self.pressed)
+        return pygame.mouse.get_pressed()
+
+    def feed(self, events):
+        for event in events:
+            if event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN,
+                              pygame.MOUSEBUTTONUP):
+                self.pos = event.pos
+            if (event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+                    and 1 <= event.button <= 3):
+                self.pressed[event.button - 1] = (
+                    event.type == pygame.MOUSEBUTTONDOWN)
+
+
+pointer = Pointer()
@@ -0,0 +1,133 @@
+import csv
+import json
+import time
+import numpy as np
+import pygame
+from core.text import TextRenderer
+
+
+class FrameProfiler:
+    def __init__(self, size=600):
+        self.size = size
+        self.index = 0
+        self.count = 0
+        self.columns = {"frame": np.zeros(size), "ducks": np.zeros(size)}
+        self.current = {}
+        self.frame_start = None
+
+    def begin_frame(self):
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            self.current["frame"] = (now - self.frame_start) * 1000
+        self.frame_start = now
+
+    def add(self, phase, ms):
+        self.current[phase] = self.current.get(phase, 0.0) + ms
+
+    def end_frame(self, ducks=0):
+        self.current["ducks"] = ducks
+        for name, value in self.current.items():
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = np.full(self.size, np.nan)
+            column[self.index] = value
+        for name, column in self.columns.items():
+            if name not in self.current:
+                column[self.index] = np.nan
+
+        self.current = {}
+        self.index = (self.index + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def history(self, name):
+        column = self.columns.get(name)
+        if column is None or not self.count:
+            return np.zeros(0)
+        if self.count < self.size:
+            return column[:self.count]
+        return np.roll(column, -self.index)
+
+    def percentiles(self, name):
+        values = self.history(name)
+        if np.isnan(values).all():
+            return (0.0, 0.0, 0.0)
+        return tuple(np.nanpercentile(values, [50, 95, 99]).tolist())
+
+    def summary(self):
+        return {name: dict(zip(("p50", "p95", "p99"),
+                               self.percentiles(name)))
+                for name in self.columns}
+
+    def dump(self, path):
+        names = list(self.columns)
+        rows = zip(*([None if np.isnan(value) else value
+                      for value in self.history(name).tolist()]
+                     for name in names))
+        if str(path).endswith(".json"):
+            with open(path, "w") as file:
+                json.dump({"summary": self.summary(),
+                           "frames": [dict(zip(names, row))
+                                      for row in rows]}, file, indent=1)
+        else:
+            with open(path, "w", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(names)
+                writer.writerows(rows)
+
+
+class ProfilerOverlay:
+    RECT = pygame.Rect(10, 10, 330, 245)
+    GRAPH = pygame.Rect(20, 155, 310, 90)
+    LINES = 9
+    BUDGET_MS = 1000 / 60
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.text = TextRenderer(max_surfaces=64)
+        self.panel = pygame.Surface(self.RECT.size, pygame.SRCALPHA)
+        self.saved = None
+
+    def restore(self, screen):
+        if self.saved is not None:
+            screen.blit(self.saved, self.RECT)
+            self.saved = None
+
+    def _p95(self, names):
+        return "  ".join(f"{name.split('.')[-1]} "
+                         f"{self.profiler.percentiles(name)[1]:.2f}"
+                         for name in names
+                         if name in self.profiler.columns)
+
+    def _lines(self, stats, scene_name):
+        p50, p95, p99 = self.profiler.percentiles("frame")
+        lines = [f"frame p50 {p50:.1f}  p95 {p95:.1f}  p99 {p99:.1f} ms",
+                 "p95 " + self._p95(("events", "update", "draw", "present")),
+                 f"{scene_name} " + self._p95(
+                     (f"{scene_name}.handle_events", f"{scene_name}.update",
+                      f"{scene_name}.draw"))]
+        lines.extend(f"{key}: {value}" for key, value in stats.items())
+        return lines
+
+    def draw(self, screen, stats, scene_name=None):
+        self.panel.fill((0, 0, 0, 170))
+        y = 6
+        for line in self._lines(stats, scene_name)[:self.LINES]:
+            self.panel.blit(self.text.render(line, 'white', 16, None),
+                            (8, y))
+            y += 15
+
+        frames = self.profiler.history("frame")
+        frames = frames[~np.isnan(frames)][-self.GRAPH.width:]
+        graph = self.GRAPH.move(-self.RECT.x, -self.RECT.y)
+        scale = graph.height / (self.BUDGET_MS * 2)
+        budget_y = graph.bottom - self.BUDGET_MS * scale
+        pygame.draw.line(self.panel, (255, 80, 80),
+                         (graph.left, budget_y), (graph.right, budget_y))
+        if len(frames) > 1:
+            points = [(graph.left + i,
+                       graph.bottom - min(value * scale, graph.height))
+                      for i, value in enumerate(frames.tolist())]
+            pygame.draw.lines(self.panel, (80, 255, 120), False, points)
+
+        self.saved = screen.subsurface(self.RECT).copy()
+        return screen.blit(self.panel, self.RECT)
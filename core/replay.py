@@ -0,0 +1,120 @@
+import struct
+import pygame
+
+MAGIC = b"DHRP"
+VERSION = 3
+HEADER = struct.Struct("<4sBQBHI8s8siIII")
+EVENT = struct.Struct("<HBhhId")
+
+EVENT_TYPES = (pygame.NOEVENT, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP,
+               pygame.MOUSEMOTION, pygame.KEYDOWN, pygame.KEYUP, pygame.QUIT)
+MAX_DELTA = 0xFFFF
+
+
+def encode_event(event, alpha=1.0):
+    kind = EVENT_TYPES.index(event.type)
+    x, y = getattr(event, "pos", (0, 0))
+    code = getattr(event, "button", None) or getattr(event, "key", 0)
+    return kind, int(x), int(y), code, alpha
+
+
+def decode_event(kind, x, y, code, alpha=1.0):
+    event_type = EVENT_TYPES[kind]
+    if event_type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+        return pygame.event.Event(event_type, pos=(x, y), button=code)
+    if event_type == pygame.MOUSEMOTION:
+        return pygame.event.Event(event_type, pos=(x, y), rel=(0, 0),
+                                  buttons=(0, 0, 0))
+    if event_type in (pygame.KEYDOWN, pygame.KEYUP):
+        return pygame.event.Event(event_type, key=code, mod=0, unicode="")
+    return pygame.event.Event(event_type)
+
+
+class Replay:
+    def __init__(self, seed, difficulty, tick_rate, scene="menu"):
+        self.seed = seed
+        self.difficulty = difficulty
+        self.tick_rate = tick_rate
+        self.scene = scene
+        self.ticks = 0
+        self.events = []
+        self.mode = ""
+        self.score = 0
+        self.hits = 0
+        self.shots = 0
+
+    def record(self, tick, events, alpha=1.0):
+        last_motion = max((i for i, event in enumerate(events)
+                           if event.type == pygame.MOUSEMOTION), default=-1)
+        for i, event in enumerate(events):
+            if event.type == pygame.MOUSEMOTION and i != last_motion:
+                continue
+            if event.type in EVENT_TYPES:
+                self.events.append((tick, encode_event(event, alpha)))
+        self.ticks = tick + 1
+
+    def finish(self, stats):
+        self.mode = stats["mode"]
+        self.score = stats["score"]
+        self.hits = stats["hits"]
+        self.shots = stats["shots"]
+
+    def stats(self):
+        return {"mode": self.mode, "score": self.score, "hits": self.hits,
+                "shots": self.shots}
+
+    def script(self):
+        script = {}
+        for tick, record in self.events:
+            if record[0]:
+                script.setdefault(tick, []).append(decode_event(*record))
+        return script
+
+    def alphas(self):
+        return {tick: record[4] for tick, record in self.events
+                if record[0] and record[4] != 1.0}
+
+    def encode(self):
+        records = []
+        last = 0
+        for tick, record in self.events:
+            while tick - last > MAX_DELTA:
+                records.append(EVENT.pack(MAX_DELTA, 0, 0, 0, 0, 1.0))
+                last += MAX_DELTA
+            records.append(EVENT.pack(tick - last, *record))
+            last = tick
+        header = HEADER.pack(MAGIC, VERSION, self.seed, self.difficulty,
+                             self.tick_rate, self.ticks,
+                             self.scene.encode("ascii"),
+                             self.mode.encode("ascii"), self.score,
+                             self.hits, self.shots, len(records))
+        return header + b"".join(records)
+
+    def save(self, path):
+        with open(path, "wb") as file:
+            file.write(self.encode())
+
+
+def decode_replay(data):
+    (magic, version, seed, difficulty, tick_rate, ticks, scene, mode,
+     score, hits, shots, count) = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a version {VERSION} replay")
+
+    replay = Replay(seed, difficulty, tick_rate,
+                    scene.rstrip(b"\0").decode("ascii"))
+    replay.ticks = ticks
+    replay.finish({"mode": mode.rstrip(b"\0").decode("ascii"),
+                   "score": score, "hits": hits, "shots": shots})
+    tick = 0
+    for delta, *record in EVENT.iter_unpack(
+            data[HEADER.size:HEADER.size + count * EVENT.size]):
+        tick += delta
+        if record[0]:
+            replay.events.append((tick, tuple(record)))
+    return replay
+
+
+def load_replay(path):
+    with open(path, "rb") as file:
+        return decode_replay(file.read())
@@ -0,0 +1,182 @@
+import time
+import queue
+import sqlite3
+import logging
+import threading
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    mode TEXT NOT NULL,
+    difficulty INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    hits INTEGER NOT NULL,
+    shots INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    accuracy REAL NOT NULL,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_board
+    ON sessions (mode, difficulty, score DESC);
+"""
+
+INSERT = ("INSERT INTO sessions (mode, difficulty, score, hits, shots, "
+          "duration, accuracy, played_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+BEST = "SELECT MAX(score) FROM sessions WHERE mode = ? AND difficulty = ?"
+BETTER = ("SELECT COUNT(*) FROM sessions "
+          "WHERE mode = ? AND difficulty = ? AND score > ?")
+TOP = ("SELECT score, hits, shots, duration, accuracy, played_at "
+       "FROM sessions WHERE mode = ? AND difficulty = ? "
+       "ORDER BY score DESC LIMIT ?")
+
+RECORD, QUERY, CLOSE = 0, 1, 2
+CLOSE_TIMEOUT = 2.0
+
+
+def connect(path):
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def session_row(mode, difficulty, score, hits, shots, duration,
+                played_at=None):
+    accuracy = hits / shots if shots else 0.0
+    return (mode, difficulty, score, hits, shots, duration, accuracy,
+            time.time() if played_at is None else played_at)
+
+
+class ResultsStore:
+    def __init__(self):
+        self.path = None
+        self.jobs = None
+        self.thread = None
+        self.written = 0
+        self.batches = 0
+
+    @property
+    def is_open(self):
+        return self.thread is not None
+
+    def open(self, path):
+        if self.is_open:
+            self.close()
+        try:
+            connection = connect(path)
+        except sqlite3.Error as error:
+            logger.warning("Not recording sessions, cannot open %s: %s",
+                           path, error)
+            return False
+        self.path = path
+        self.jobs = queue.Queue()
+        self.thread = threading.Thread(target=self._run,
+                                       args=(connection,),
+                                       name="results", daemon=True)
+        self.thread.start()
+        return True
+
+    def _run(self, connection):
+        while True:
+            jobs = self._drain()
+            rows = [payload for kind, payload, _ in jobs if kind == RECORD]
+            failed = self._write(connection, rows) if rows else None
+            if not self._answer(connection, jobs, failed):
+                return
+
+    def _drain(self):
+        jobs = [self.jobs.get()]
+        while True:
+            try:
+                jobs.append(self.jobs.get_nowait())
+            except queue.Empty:
+                return jobs
+
+    def _write(self, connection, rows):
+        try:
+            with connection:
+                connection.executemany(INSERT, rows)
+        except sqlite3.Error as error:
+            logger.error("Could not store %d sessions: %s", len(rows), error)
+            return error
+        self.written += len(rows)
+        self.batches += 1
+        return None
+
+    def _answer(self, connection, jobs, failed):
+        for kind, payload, future in jobs:
+            if kind == QUERY:
+                if failed is not None:
+                    future.set_exception(failed)
+                    continue
+                try:
+                    future.set_result(payload(connection))
+                except Exception as error:
+                    future.set_exception(error)
+            elif kind == CLOSE:
+                try:
+                    connection.close()
+                except sqlite3.Error as error:
+                    logger.error("Could not close %s: %s", self.path, error)
+                future.set_result(None)
+                return False
+        return True
+
+    def _submit(self, kind, payload=None):
+        future = Future()
+        self.jobs.put((kind, payload, future))
+        return future
+
+    def record(self, mode, difficulty, score, hits, shots, duration):
+        if not self.is_open:
+            return None
+        self.jobs.put((RECORD, session_row(mode, difficulty, score, hits,
+                                           shots, duration), None))
+        return self.standing(mode, difficulty, score)
+
+    def record_many(self, rows):
+        if self.is_open:
+            for row in rows:
+                self.jobs.put((RECORD, row, None))
+
+    def query(self, function):
+        if not self.is_open:
+            return None
+        return self._submit(QUERY, function)
+
+    def standing(self, mode, difficulty, score):
+        def rank_and_best(connection):
+            better = connection.execute(
+                BETTER, (mode, difficulty, score)).fetchone()[0]
+            best = connection.execute(BEST, (mode, difficulty)).fetchone()[0]
+            return better + 1, best
+        return self.query(rank_and_best)
+
+    def top(self, mode, difficulty, limit=10):
+        return self.query(lambda connection: connection.execute(
+            TOP, (mode, difficulty, limit)).fetchall())
+
+    def flush(self, timeout=CLOSE_TIMEOUT):
+        future = self.query(lambda connection: None)
+        if future is not None:
+            future.result(timeout)
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        if not self.is_open:
+            return
+        self._submit(CLOSE)
+        self.thread.join(timeout)
+        if self.thread.is_alive():
+            logger.warning("Results writer did not stop within %.1f s",
+                           timeout)
+        else:
+            logger.info("Stored %d sessions in %s", self.written, self.path)
+        self.thread = None
+        self.jobs = None
+
+
+results = ResultsStore()
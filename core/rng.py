@@ -0,0 +1,29 @@
+import random
+
+
+class SessionRandom:
+    def __init__(self):
+        self.reset()
+
+    def seed(self, seed):
+        self.seed_value = seed
+        self.source = random.Random(seed)
+
+    def reset(self):
+        self.seed_value = None
+        self.source = random
+
+    def save(self):
+        return self.seed_value, self.source
+
+    def restore(self, state):
+        self.seed_value, self.source = state
+
+    def randint(self, a, b):
+        return self.source.randint(a, b)
+
+    def choice(self, seq):
+        return self.source.choice(seq)
+
+
+rng = SessionRandom()
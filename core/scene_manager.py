@@ -1,19 +1,108 @@
+import time
+import pygame
+
+
+class SceneRegistry(dict):
+    def __init__(self, scene_manager):
+        super().__init__()
+        self.scene_manager = scene_manager
+        self.factories = {}
+
+    def __missing__(self, name):
+        factory = self.factories.pop(name)
+        start = time.perf_counter()
+        scene = self[name] = factory(self.scene_manager)
+        self.scene_manager.build_ms[name] = (
+            (time.perf_counter() - start) * 1000)
+        return scene
+
+    def __contains__(self, name):
+        return super().__contains__(name) or name in self.factories
+
+    def get(self, name, default=None):
+        return self[name] if name in self else default
+
+    def loaded(self, name):
+        return super().__contains__(name)
+
+
 class SceneManager:
-    def __init__(self):
-        self.scenes = {}
+    def __init__(self, profiler=None, base_events=None):
+        self.scenes = SceneRegistry(self)
+        self.base_events = base_events
+        self.allowed_events = None
         self.active_scene = None
+        self.active_name = None
+        self.drawn_scene = None
+        self.profiler = profiler
+        self.build_ms = {}
 
     def add_scene(self, name, scene):
+        self.scenes.factories.pop(name, None)
         self.scenes[name] = scene
 
+    def register(self, name, factory):
+        self.scenes.pop(name, None)
+        self.scenes.factories[name] = factory
+
     def set_scene(self, name):
         self.active_scene = self.scenes.get(name)
+        self.active_name = name
+        self.filter_events()
+
+    def filter_events(self):
+        if self.base_events is None:
+            return
+        dispatcher = getattr(self.active_scene, "events", None)
+        allowed = set(self.base_events)
+        if dispatcher is not None:
+            allowed |= dispatcher.event_types()
+        if allowed == self.allowed_events or not pygame.display.get_init():
+            return
+        self.allowed_events = allowed
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(list(allowed))
+
+    def preload(self, ready=None):
+        for name in getattr(self.active_scene, "preload_scenes", ()):
+            if self.scenes.loaded(name) or name not in self.scenes:
+                continue
+            factory = self.scenes.factories[name]
+            if ready is not None and not ready(getattr(factory, "ASSETS",
+                                                       ())):
+                continue
+            self.scenes[name]
+            return name
+        return None
+
+    def invalidate(self):
+        self.drawn_scene = None
+
+    def _timed(self, method, *args):
+        if self.profiler is None:
+            return getattr(self.active_scene, method)(*args)
+
+        name = self.active_name
+        start = time.perf_counter()
+        result = getattr(self.active_scene, method)(*args)
+        self.profiler.add(f"{name}.{method}",
+                          (time.perf_counter() - start) * 1000)
+        return result
 
     def update(self, events):
         if self.active_scene:
-            self.active_scene.handle_events(events)
-            self.active_scene.update()
+            self._timed("handle_events", events)
+            self._timed("update")
 
     def draw(self, screen):
-        if self.active_scene:
-            self.active_scene.draw(screen)
+        if not self.active_scene:
+            return []
+
+        if self.active_scene is not self.drawn_scene:
+            self.drawn_scene = self.active_scene
+            if hasattr(self.active_scene, "invalidate"):
+                self.active_scene.invalidate()
+            self._timed("draw", screen)
+            return None
+
+        return self._timed("draw", screen)
@@ -1,6 +1,4 @@
-import pygame
-
-pygame.init()
+import math
 
 SCREEN_WIDTH = 900
 SCREEN_HEIGHT = 800
@@ -10,3 +8,30 @@ FPS = 60
 BG_COLOR = (0, 0, 0)
 
 DIFFICULTY_LEVEL = [0]
+DIFFICULTY_FILE = "assets/waves/difficulty.json"
+WAVES_FILE = "assets/waves/modes.json"
+
+AUDIO_ENABLED = [True]
+
+TICK_RATE = 60
+MAX_TICKS_PER_FRAME = 5
+
+MAX_DIRTY_RECTS = 64
+DIRTY_RECT_COLOR = (255, 0, 255)
+
+GUN_ROTATION_STEP = 1.0
+GUN_ROTATION_CACHE_SIZE = 2 * (math.ceil(90 / GUN_ROTATION_STEP) + 1)
+GUN_ROTATION_PRECOMPUTE = False
+
+PLAY_AREA = (0, 0, 900, 600)
+
+HIT_TEST_MODE = ["mask"]
+
+PRELOAD_SCENES = True
+
+ASSET_PACK = "assets.pack"
+
+STATS_DB = "stats.db"
+
+ASYNC_ASSETS = True
+ASSET_LOADER_WORKERS = 2
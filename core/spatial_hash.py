@@ -0,0 +1,95 @@
+import numpy as np
+
+CELL_OFFSET = 1 << 20
+
+
+class SpatialHash:
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.clear()
+
+    def clear(self):
+        self.keys = np.empty(0, dtype=np.int64)
+        self.items = np.empty(0, dtype=np.int64)
+        self.left = np.empty(0)
+        self.top = np.empty(0)
+        self.right = np.empty(0)
+        self.bottom = np.empty(0)
+
+    def _key(self, cell_x, cell_y):
+        return (cell_x + CELL_OFFSET) * (CELL_OFFSET * 2) + (
+            cell_y + CELL_OFFSET)
+
+    def rebuild(self, left, top, width, height):
+        self.left = np.array(left, dtype=np.float64)
+        self.top = np.array(top, dtype=np.float64)
+        self.right = self.left + width
+        self.bottom = self.top + height
+
+        n = len(self.left)
+        if not n:
+            self.keys = np.empty(0, dtype=np.int64)
+            self.items = np.empty(0, dtype=np.int64)
+            return
+
+        cell = self.cell_size
+        x0 = np.floor_divide(self.left, cell).astype(np.int64)
+        y0 = np.floor_divide(self.top, cell).astype(np.int64)
+        x1 = np.floor_divide(self.right - 1, cell).astype(np.int64)
+        y1 = np.floor_divide(self.bottom - 1, cell).astype(np.int64)
+        span_x = x1 - x0 + 1
+        counts = span_x * (y1 - y0 + 1)
+
+        items = np.repeat(np.arange(n, dtype=np.int64), counts)
+        local = np.arange(len(items)) - np.repeat(
+            np.cumsum(counts) - counts, counts)
+        cell_x = x0[items] + local % span_x[items]
+        cell_y = y0[items] + local // span_x[items]
+
+        keys = self._key(cell_x, cell_y)
+        order = np.argsort(keys)
+        self.keys = keys[order]
+        self.items = items[order]
+
+    def discard(self, item):
+        self.items[self.items == item] = -1
+
+    def move(self, source, target):
+        self.items[self.items == source] = target
+        self.left[target] = self.left[source]
+        self.top[target] = self.top[source]
+        self.right[target] = self.right[source]
+        self.bottom[target] = self.bottom[source]
+
+    def _candidates(self, left, top, right, bottom):
+        cell = self.cell_size
+        found = []
+        for cell_x in range(int(left // cell), int((right - 1) // cell) + 1):
+            for cell_y in range(int(top // cell),
+                                int((bottom - 1) // cell) + 1):
+                key = self._key(cell_x, cell_y)
+                start = np.searchsorted(self.keys, key, side="left")
+                end = np.searchsorted(self.keys, key, side="right")
+                if start != end:
+                    found.extend(self.items[start:end].tolist())
+        return found
+
+    def query_rect(self, left, top, right, bottom):
+        hits = set()
+        for item in self._candidates(left, top, right, bottom):
+            if (item >= 0 and item not in hits
+                    and self.left[item] < right
+                    and left < self.right[item]
+                    and self.top[item] < bottom
+                    and top < self.bottom[item]):
+                hits.add(item)
+        return sorted(hits)
+
+    def query_point(self, x, y):
+        return self.query_rect(x, y, x + 1, y + 1)
+
+    def query_points(self, points):
+        hits = set()
+        for x, y in points:
+            hits.update(self.query_rect(x, y, x + 1, y + 1))
+        return sorted(hits)
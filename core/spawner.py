@@ -0,0 +1,88 @@
+import json
+import heapq
+from core.assets import assets
+from core.rng import rng
+from core.settings import DIFFICULTY_LEVEL, DIFFICULTY_FILE, WAVES_FILE
+
+STREAM, BURST, SPAWN = 0, 1, 2
+
+
+def load_config(path):
+    source = assets.source(path)
+    if isinstance(source, str):
+        with open(source) as file:
+            return json.load(file)
+    return json.load(source)
+
+
+def sample(spec):
+    if isinstance(spec, list):
+        return rng.randint(*spec)
+    if isinstance(spec, dict):
+        return rng.choice(spec["choice"])
+    return spec
+
+
+difficulties = load_config(DIFFICULTY_FILE)
+waves = load_config(WAVES_FILE)
+
+
+def difficulty_tier(level=None):
+    level = DIFFICULTY_LEVEL[0] if level is None else level
+    levels = difficulties["levels"]
+    if 0 <= level < len(levels):
+        return levels[level]
+    return difficulties["default"]
+
+
+class SpawnScheduler:
+    def __init__(self, wave, flock, now):
+        self.wave = wave
+        self.flock = flock
+        self.cap = wave["cap"]
+        self.lanes = wave["lanes"]
+        self.queue = []
+        self.sequence = 0
+        self.spawned = 0
+        self.start = now
+
+        self.push(now + wave["interval"], STREAM)
+        for index, burst in enumerate(wave.get("bursts", ())):
+            start = burst["at"] if "at" in burst else burst["every"]
+            self.push(now + start, BURST, index)
+
+    def push(self, due, kind, data=None):
+        self.sequence += 1
+        heapq.heappush(self.queue, (due, self.sequence, kind, data))
+
+    def next_due(self):
+        return self.queue[0][0] if self.queue else None
+
+    def spawn(self, lane=None):
+        if lane is None:
+            lane = rng.choice(self.lanes)
+        self.spawned += 1
+        return self.flock.spawn(x=sample(lane["x"]), y=sample(lane["y"]),
+                                move_angle=sample(lane["angle"]),
+                                direction=lane["direction"])
+
+    def update(self, now):
+        queue = self.queue
+        while queue and queue[0][0] < now and len(self.flock) < self.cap:
+            due, _, kind, data = heapq.heappop(queue)
+            if kind == STREAM:
+                self.spawn()
+                self.push(now + self.wave["interval"], STREAM)
+            elif kind == BURST:
+                burst = self.wave["bursts"][data]
+                self.push(due, SPAWN, (data, burst["count"]))
+                if burst.get("every"):
+                    self.push(due + burst["every"], BURST, data)
+            else:
+                index, remaining = data
+                burst = self.wave["bursts"][index]
+                lane = burst.get("lane")
+                self.spawn(None if lane is None else self.lanes[lane])
+                if remaining > 1:
+                    self.push(due + burst.get("gap", 0), SPAWN,
+                              (index, remaining - 1))
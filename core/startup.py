@@ -0,0 +1,40 @@
+import time
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = {}
+        self.first_frame_ms = None
+
+    def add(self, name, ms):
+        self.phases[name] = self.phases.get(name, 0.0) + ms
+
+    @contextmanager
+    def measure(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def first_frame(self):
+        if self.first_frame_ms is None:
+            self.first_frame_ms = (time.perf_counter() - self.start) * 1000
+        return self.first_frame_ms
+
+    def report(self, extra=None):
+        phases = dict(self.phases)
+        phases.update(extra or {})
+        lines = [f"  {name:<14}{ms:8.1f} ms" for name, ms in phases.items()]
+        if self.first_frame_ms is not None:
+            lines.append(f"  {'first frame':<14}{self.first_frame_ms:8.1f} ms")
+        logger.info("Startup timing:\n%s", "\n".join(lines))
+        return phases
+
+
+startup_timer = StartupTimer()
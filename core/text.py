@@ -0,0 +1,87 @@
+import pygame
+from collections import OrderedDict
+from core.assets import assets
+
+FONT_PATH = "assets/font/PT-Serif-Bold-Italic.ttf"
+
+
+class TextRenderer:
+    def __init__(self, max_surfaces=256):
+        self.max_surfaces = max_surfaces
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, size, path=FONT_PATH):
+        key = (path, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.Font(path and assets.source(path), size)
+            self.fonts[key] = font
+        return font
+
+    def render(self, text, color, size, path=FONT_PATH):
+        key = (path, text, color, size)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.font(size, path).render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_surfaces:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "fonts": len(self.fonts),
+            "surfaces": len(self.surfaces),
+        }
+
+    def clear(self):
+        self.fonts.clear()
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+text_renderer = TextRenderer()
+
+
+class HudField:
+    def __init__(self, pos, size, color, renderer=None):
+        self.pos = pos
+        self.size = size
+        self.color = color
+        self.renderer = renderer or text_renderer
+        self.text = None
+        self.surface = None
+        self.rect = None
+
+    def render(self, text):
+        if text != self.text or self.surface is None:
+            self.text = text
+            self.surface = self.renderer.render(text, self.color, self.size)
+        return self.surface
+
+    def stage(self, text):
+        changed = text != self.text
+        surface = self.render(text)
+        if not changed:
+            return (surface, self.pos), []
+
+        rect = surface.get_rect(topleft=self.pos)
+        dirty = [rect] if self.rect is None else [self.rect, rect]
+        self.rect = rect
+        return (surface, self.pos), dirty
+
+    def draw(self, screen, text):
+        item, dirty = self.stage(text)
+        screen.blit(*item)
+        return dirty
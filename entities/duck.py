@@ -1,11 +1,32 @@
 import pygame
 import math
-import random
-from core.settings import DIFFICULTY_LEVEL
+from core.settings import HIT_TEST_MODE, PLAY_AREA
+from core.assets import assets
+from core.clock import game_clock
+from core.rng import rng
+from core.spawner import difficulty_tier, sample
+
+
+PLAY_LEFT, PLAY_TOP, PLAY_WIDTH, PLAY_HEIGHT = PLAY_AREA
+PLAY_RIGHT = PLAY_LEFT + PLAY_WIDTH
+PLAY_BOTTOM = PLAY_TOP + PLAY_HEIGHT
+
+cull_stats = {"drawn": 0, "culled": 0}
 
 
 class Duck:
+    ASSETS = ("assets/targets/1.png", "assets/targets/2.png",
+              "assets/targets/3.png", "assets/targets/4.png")
+
+    __slots__ = ("x", "y", "move_angle", "amplitude", "frequency", "angle",
+                 "direction", "size", "speed", "image_up", "image_down",
+                 "image", "sprites", "masks", "dx", "dy", "perp_x",
+                 "perp_y", "base_x", "base_y", "born")
+
     def __init__(self, x, y, move_angle, direction="left"):
+        self.reset(x, y, move_angle, direction)
+
+    def reset(self, x, y, move_angle, direction="left"):
         self.x = x
         self.y = y
         self.move_angle = math.radians(move_angle)
@@ -13,82 +34,127 @@ class Duck:
         self.frequency = 0.1
         self.angle = 0
         self.direction = direction
+        self.born = game_clock.get_ticks()
 
-        self.size = 100
-        self.speed = 7
+        tier = difficulty_tier()
+        self.speed = sample(tier["speed"])
+        self.size = sample(tier["size"])
 
         if direction == "left":
-            self.image_down = pygame.image.load("assets/targets/4.png")
-            self.image_up = pygame.image.load("assets/targets/3.png")
+            self.sprites = ("assets/targets/3.png", "assets/targets/4.png")
         else:
-            self.image_up = pygame.image.load("assets/targets/2.png")
-            self.image_down = pygame.image.load("assets/targets/1.png")
-
-        if (DIFFICULTY_LEVEL[0] == 0):
-            self.speed = random.randint(3, 6)
-            self.size = random.randint(90, 120)
-
-        elif (DIFFICULTY_LEVEL[0] == 1):
-            self.speed = random.randint(6, 9)
-            self.size = random.randint(60, 90)
-        elif (DIFFICULTY_LEVEL[0] == 2):
-            self.speed = random.randint(9, 13)
-            self.size = random.randint(30, 60)
-
-        self.image_up = pygame.transform.scale(self.image_up,
-                                               (self.size+20,
-                                                self.size)
-                                               )
-        self.image_down = pygame.transform.scale(self.image_down,
-                                                 (self.size+20,
-                                                  self.size)
-                                                 )
+            self.sprites = ("assets/targets/2.png", "assets/targets/1.png")
+        self.image_up = assets.scaled(self.sprites[0],
+                                      (self.size+20, self.size))
+        self.image_down = assets.scaled(self.sprites[1],
+                                        (self.size+20, self.size))
         self.image = self.image_up
+        self.masks = None
 
         if self.direction == "right":
             self.speed *= -1
 
         self.dx = math.cos(self.move_angle) * self.speed
         self.dy = math.sin(self.move_angle) * self.speed
+        perp_angle = self.move_angle + math.pi / 2
+        self.perp_x = math.cos(perp_angle)
+        self.perp_y = math.sin(perp_angle)
 
         self.base_x = self.x
         self.base_y = self.y
 
-    def update(self):
-        self.base_x += self.dx
-        self.base_y += self.dy
+    def gone(self):
+        if (self.base_y + self.amplitude + self.size <= PLAY_TOP
+                or self.base_y - self.amplitude >= PLAY_BOTTOM):
+            return True
+        if self.direction == "left":
+            return self.base_x - self.amplitude >= PLAY_RIGHT
+        return self.base_x + self.amplitude + self.size + 20 <= PLAY_LEFT
+
+    def update(self, dt=1.0):
+        self.base_x += self.dx * dt
+        self.base_y += self.dy * dt
 
         perpendicular_offset = self.amplitude * math.sin(self.angle)
-        perp_angle = self.move_angle + math.pi / 2
+        offset_y = perpendicular_offset * self.perp_y
 
-        self.x = self.base_x + perpendicular_offset * math.cos(perp_angle)
-        self.y = self.base_y + perpendicular_offset * math.sin(perp_angle)
+        self.x = self.base_x + perpendicular_offset * self.perp_x
+        self.y = self.base_y + offset_y
 
-        self.angle += self.frequency
+        self.angle += self.frequency * dt
 
-        if self.dy + perpendicular_offset * math.sin(perp_angle) < 0:
+        if self.dy + offset_y < 0:
             self.image = self.image_up
         else:
             self.image = self.image_down
 
-        if self.direction == "left" and (self.base_x > 900
-                                         or self.base_y < -50
-                                         or self.base_y > 600):
-            self.base_x = random.randint(-100, 0)
-            self.base_y = random.randint(100, 500)
-        elif self.direction == "right" and (self.base_x < -100
-                                            or self.base_y < -50
-                                            or self.base_y > 600):
-            self.base_x = random.randint(900, 1000)
-            self.base_y = random.randint(100, 500)
+        if self.gone():
+            if self.direction == "left":
+                self.base_x = rng.randint(-100, 0)
+            else:
+                self.base_x = rng.randint(900, 1000)
+            self.base_y = rng.randint(100, 500)
+
+    def position_at(self, ticks):
+        base_x = self.base_x + self.dx * ticks
+        base_y = self.base_y + self.dy * ticks
+        phase = self.angle + self.frequency * (ticks - 1)
+        offset = self.amplitude * math.sin(phase)
+        return base_x + offset * self.perp_x, base_y + offset * self.perp_y
+
+    def visible(self):
+        return (self.x + self.size + 20 > PLAY_LEFT and self.x < PLAY_RIGHT
+                and self.y + self.size > PLAY_TOP and self.y < PLAY_BOTTOM)
 
     def draw(self, screen):
+        if not self.visible():
+            cull_stats["culled"] += 1
+            return
+        cull_stats["drawn"] += 1
         screen.blit(self.image, (self.x, self.y))
 
+    def hit_mask(self, up=True):
+        if self.masks is None:
+            size = (self.size+20, self.size)
+            self.masks = (assets.mask(self.sprites[0], size),
+                          assets.mask(self.sprites[1], size))
+        return self.masks[0 if up else 1]
+
+    def overlaps(self, rect, x, y, up=True):
+        left = int(x)
+        top = int(y)
+        if (rect.right <= left or rect.left >= left + self.size + 20
+                or rect.bottom <= top or rect.top >= top + self.size):
+            return False
+        if HIT_TEST_MODE[0] != "mask":
+            return True
+        return mask_overlaps(self.hit_mask(up), left, top, rect)
+
     def check_collision(self, rect):
-        duck_rect = pygame.Rect(self.x, self.y, self.size+20, self.size)
-        return duck_rect.colliderect(rect)
+        return self.overlaps(rect, self.x, self.y,
+                             self.image is self.image_up)
 
     def get_score_value(self):
         duck_speed = abs(self.speed)
         return int(1/self.size + 5 * duck_speed)
+
+
+filled_masks = {}
+
+
+def mask_overlaps(mask, left, top, rect):
+    width, height = mask.get_size()
+    x0 = max(rect.left - left, 0)
+    y0 = max(rect.top - top, 0)
+    x1 = min(rect.right - left, width)
+    y1 = min(rect.bottom - top, height)
+    if x0 >= x1 or y0 >= y1:
+        return False
+    if x1 - x0 == 1 and y1 - y0 == 1:
+        return bool(mask.get_at((x0, y0)))
+
+    size = (x1 - x0, y1 - y0)
+    area = filled_masks.get(size)
+    if area is None:
+        area = filled_masks[size] = pygame.mask.Mask(size, fill=True)
+    return mask.overlap(area, (x0, y0)) is not None
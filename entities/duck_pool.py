@@ -0,0 +1,51 @@
+from entities.duck import Duck
+
+
+class DuckPool:
+    def __init__(self, max_size=64):
+        self.max_size = max_size
+        self.free = []
+        self.created = 0
+        self.reused = 0
+        self.in_use = 0
+        self.high_water = 0
+
+    def acquire(self, x, y, move_angle, direction="left"):
+        if self.free:
+            duck = self.free.pop()
+            duck.reset(x, y, move_angle, direction)
+            self.reused += 1
+        else:
+            duck = Duck(x, y, move_angle, direction)
+            self.created += 1
+        self.in_use += 1
+        self.high_water = max(self.high_water, self.in_use)
+        return duck
+
+    def release(self, duck):
+        self.in_use = max(self.in_use - 1, 0)
+        if len(self.free) < self.max_size:
+            self.free.append(duck)
+
+    def release_many(self, ducks):
+        for duck in ducks:
+            self.release(duck)
+
+    def stats(self):
+        return {
+            "free": len(self.free),
+            "in_use": self.in_use,
+            "high_water": self.high_water,
+            "created": self.created,
+            "reused": self.reused,
+        }
+
+    def clear(self):
+        self.free.clear()
+        self.created = 0
+        self.reused = 0
+        self.in_use = 0
+        self.high_water = 0
+
+
+duck_pool = DuckPool()
@@ -0,0 +1,273 @@
+import numpy as np
+import pygame
+from core.settings import HIT_TEST_MODE
+from core.spatial_hash import SpatialHash
+from entities.duck import (PLAY_BOTTOM, PLAY_LEFT, PLAY_RIGHT, PLAY_TOP,
+                           cull_stats)
+from entities.duck_pool import duck_pool
+from core.rng import rng
+
+
+class DuckFlock:
+    FIELDS = ("x", "y", "base_x", "base_y", "dx", "dy", "angle",
+              "amplitude", "frequency", "perp_x", "perp_y", "size", "speed")
+    STATE = ("prev_x", "prev_y")
+    FLAGS = ("left", "up", "snap")
+    MAX_INCREMENTAL_KILLS = 8
+    MAX_SCALAR_MASK_TESTS = 32
+
+    def __init__(self, capacity=16, pool=None):
+        self.pool = pool or duck_pool
+        self.count = 0
+        self.ducks = []
+        self.grid = SpatialHash()
+        self.grid_dirty = True
+        self.drawn_rects = []
+        self.drawn_alpha = 1.0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        old_count = self.count
+        for name in self.FIELDS + self.STATE + self.FLAGS:
+            dtype = bool if name in self.FLAGS else np.float64
+            array = np.zeros(capacity, dtype=dtype)
+            if old_count:
+                array[:old_count] = getattr(self, name)[:old_count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        self.sync()
+        return iter(self.ducks[:self.count])
+
+    def append(self, duck):
+        if self.count == self.capacity:
+            self._allocate(self.capacity * 2)
+
+        i = self.count
+        for name in self.FIELDS:
+            getattr(self, name)[i] = getattr(duck, name)
+        self.prev_x[i] = duck.x
+        self.prev_y[i] = duck.y
+        self.left[i] = duck.direction == "left"
+        self.up[i] = duck.image is duck.image_up
+        self.snap[i] = False
+        self.ducks.append(duck)
+        self.count += 1
+        self.grid_dirty = True
+
+    def spawn(self, x, y, move_angle, direction="left"):
+        duck = self.pool.acquire(x, y, move_angle, direction)
+        self.append(duck)
+        return duck
+
+    def clear(self):
+        self.pool.release_many(self.ducks)
+        self.count = 0
+        self.ducks.clear()
+        self.grid_dirty = True
+
+    def remove_at(self, i):
+        last = self.count - 1
+        if not self.grid_dirty:
+            self.grid.discard(i)
+            if i != last:
+                self.grid.move(last, i)
+        if i != last:
+            for name in self.FIELDS + self.STATE + self.FLAGS:
+                array = getattr(self, name)
+                array[i] = array[last]
+            self.ducks[i] = self.ducks[last]
+        self.ducks.pop()
+        self.count = last
+
+    def sync(self):
+        n = self.count
+        for duck, x, y, base_x, base_y, angle, up in zip(
+                self.ducks, self.x[:n].tolist(), self.y[:n].tolist(),
+                self.base_x[:n].tolist(), self.base_y[:n].tolist(),
+                self.angle[:n].tolist(), self.up[:n].tolist()):
+            duck.x = x
+            duck.y = y
+            duck.base_x = base_x
+            duck.base_y = base_y
+            duck.angle = angle
+            duck.image = duck.image_up if up else duck.image_down
+
+    def update(self, dt=1.0):
+        n = self.count
+        if not n:
+            return
+        self.grid_dirty = True
+        self.drawn_alpha = 1.0
+
+        x = self.x[:n]
+        y = self.y[:n]
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+
+        base_x = self.base_x[:n]
+        base_y = self.base_y[:n]
+        base_x += self.dx[:n] * dt
+        base_y += self.dy[:n] * dt
+
+        angle = self.angle[:n]
+        perpendicular_offset = self.amplitude[:n] * np.sin(angle)
+        offset_y = perpendicular_offset * self.perp_y[:n]
+
+        np.add(base_x, perpendicular_offset * self.perp_x[:n], out=x)
+        np.add(base_y, offset_y, out=y)
+
+        angle += self.frequency[:n] * dt
+
+        np.less(self.dy[:n] + offset_y, 0, out=self.up[:n])
+
+        snap = self.snap[:n]
+        if snap.any():
+            self.prev_x[:n][snap] = x[snap]
+            self.prev_y[:n][snap] = y[snap]
+            snap[:] = False
+
+        left = self.left[:n]
+        amplitude = self.amplitude[:n]
+        size = self.size[:n]
+        off_screen = ((base_y + amplitude + size <= PLAY_TOP)
+                      | (base_y - amplitude >= PLAY_BOTTOM))
+        respawn_left = left & ((base_x - amplitude >= PLAY_RIGHT)
+                               | off_screen)
+        respawn_right = ~left & ((base_x + amplitude + size + 20 <= PLAY_LEFT)
+                                 | off_screen)
+        snap |= respawn_left | respawn_right
+
+        for i in np.flatnonzero(respawn_left).tolist():
+            base_x[i] = rng.randint(-100, 0)
+            base_y[i] = rng.randint(100, 500)
+        for i in np.flatnonzero(respawn_right).tolist():
+            base_x[i] = rng.randint(900, 1000)
+            base_y[i] = rng.randint(100, 500)
+
+    def positions(self, alpha=1.0):
+        n = self.count
+        if alpha >= 1.0:
+            return self.x[:n], self.y[:n]
+        prev_x = self.prev_x[:n]
+        prev_y = self.prev_y[:n]
+        return (prev_x + (self.x[:n] - prev_x) * alpha,
+                prev_y + (self.y[:n] - prev_y) * alpha)
+
+    def positions_at(self, ticks):
+        n = self.count
+        offset = self.amplitude[:n] * np.sin(
+            self.angle[:n] + self.frequency[:n] * (ticks - 1))
+        return (self.base_x[:n] + self.dx[:n] * ticks
+                + offset * self.perp_x[:n],
+                self.base_y[:n] + self.dy[:n] * ticks
+                + offset * self.perp_y[:n])
+
+    def visible(self, xs, ys):
+        size = self.size[:self.count]
+        return ((xs + size + 20 > PLAY_LEFT) & (xs < PLAY_RIGHT)
+                & (ys + size > PLAY_TOP) & (ys < PLAY_BOTTOM))
+
+    def hit_positions(self):
+        return self.positions(self.drawn_alpha)
+
+    def show(self, alpha):
+        if alpha != self.drawn_alpha:
+            self.drawn_alpha = alpha
+            self.grid_dirty = True
+
+    def draw(self, screen, alpha=1.0):
+        self.show(alpha)
+        xs, ys = self.positions(alpha)
+        shown = np.flatnonzero(self.visible(xs, ys)).tolist()
+        cull_stats["drawn"] += len(shown)
+        cull_stats["culled"] += self.count - len(shown)
+
+        ducks = self.ducks
+        xs = xs.tolist()
+        ys = ys.tolist()
+        up = self.up[:self.count].tolist()
+        rects = screen.blits(
+            [(ducks[i].image_up if up[i] else ducks[i].image_down,
+              (xs[i], ys[i])) for i in shown])
+
+        dirty = self.drawn_rects + rects
+        self.drawn_rects = rects
+        return dirty
+
+    def index(self):
+        if self.grid_dirty:
+            size = self.size[:self.count]
+            xs, ys = self.hit_positions()
+            self.grid.rebuild(np.trunc(xs), np.trunc(ys), size + 20, size)
+            self.grid_dirty = False
+        return self.grid
+
+    def _exact(self, indices, rect):
+        if HIT_TEST_MODE[0] != "mask":
+            return indices
+        ducks = self.ducks
+        all_xs, all_ys = self.hit_positions()
+        if rect.width == 1 and rect.height == 1:
+            if len(indices) > self.MAX_SCALAR_MASK_TESTS:
+                xs = all_xs[indices].astype(np.int64).tolist()
+                ys = all_ys[indices].astype(np.int64).tolist()
+                up = self.up[indices].tolist()
+            else:
+                xs = [int(all_xs[i]) for i in indices]
+                ys = [int(all_ys[i]) for i in indices]
+                up = [self.up[i] for i in indices]
+            return [i for i, x, y, frame in zip(indices, xs, ys, up)
+                    if ducks[i].hit_mask(frame).get_at((rect.x - x,
+                                                        rect.y - y))]
+        return [i for i in indices
+                if ducks[i].overlaps(rect, all_xs[i], all_ys[i],
+                                     self.up[i])]
+
+    def collide(self, rect):
+        return self._exact(self.index().query_rect(
+            rect.left, rect.top, rect.right, rect.bottom), rect)
+
+    def collide_points(self, points):
+        if HIT_TEST_MODE[0] != "mask":
+            return self.index().query_points(points)
+        hits = set()
+        for x, y in points:
+            hits.update(self.collide(pygame.Rect(x, y, 1, 1)))
+        return sorted(hits)
+
+    def remove_many(self, indices):
+        kill = np.asarray(indices, dtype=np.int64)
+        count = self.count - len(kill)
+        holes = kill[kill < count]
+        tail = np.arange(count, self.count)
+        movers = tail[~np.isin(tail, kill)]
+
+        for name in self.FIELDS + self.STATE + self.FLAGS:
+            array = getattr(self, name)
+            array[holes] = array[movers]
+        for hole, mover in zip(holes.tolist(), movers.tolist()):
+            self.ducks[hole] = self.ducks[mover]
+        del self.ducks[count:]
+        self.count = count
+        self.grid_dirty = True
+
+    def _kill(self, indices):
+        killed = [self.ducks[i] for i in reversed(indices)]
+        if len(indices) > self.MAX_INCREMENTAL_KILLS:
+            self.remove_many(indices)
+        else:
+            for i in reversed(indices):
+                self.remove_at(i)
+        self.pool.release_many(killed)
+        return killed
+
+    def hit(self, rect):
+        return self._kill(self.collide(rect))
+
+    def hit_points(self, points):
+        return self._kill(self.collide_points(points))
@@ -1,25 +1,113 @@
 import pygame
 import math
-from core.settings import SCREEN_WIDTH, SCREEN_HEIGHT
+import time
+import logging
+from collections import OrderedDict
+from core.settings import (SCREEN_WIDTH, SCREEN_HEIGHT, GUN_ROTATION_STEP,
+                           GUN_ROTATION_CACHE_SIZE, GUN_ROTATION_PRECOMPUTE)
+from core.assets import assets
+from core.audio import load_sound
+from core.pointer import pointer
+
+logger = logging.getLogger(__name__)
+
+
+class RotationCache:
+    def __init__(self, image, offsets, step=GUN_ROTATION_STEP,
+                 max_entries=GUN_ROTATION_CACHE_SIZE):
+        self.images = {False: image,
+                       True: pygame.transform.flip(image, True, False)}
+        self.offsets = offsets
+        self.step = step
+        self.max_entries = max_entries
+        self.sprites = OrderedDict()
+        self.build_ms = 0.0
+        self.precomputed = False
+
+    def get(self, angle, flipped):
+        key = (flipped, round(angle / self.step))
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self._rotate(key)
+        else:
+            self.sprites.move_to_end(key)
+        return sprite, self.offsets[flipped]
+
+    def _rotate(self, key):
+        start = time.perf_counter()
+        sprite = pygame.transform.rotate(self.images[key[0]],
+                                         key[1] * self.step)
+        self.build_ms += (time.perf_counter() - start) * 1000
+        self.sprites[key] = sprite
+        if self.max_entries and len(self.sprites) > self.max_entries:
+            self.sprites.popitem(last=False)
+        return sprite
+
+    def precompute(self, flipped, start_angle, end_angle):
+        self.precomputed = True
+        first = round(start_angle / self.step)
+        last = round(end_angle / self.step)
+        for index in range(first, last + 1):
+            if (flipped, index) not in self.sprites:
+                self._rotate((flipped, index))
+
+    def stats(self):
+        return {
+            "entries": len(self.sprites),
+            "bytes": sum(sprite.get_width() * sprite.get_height()
+                         * sprite.get_bytesize()
+                         for sprite in self.sprites.values()),
+            "build_ms": self.build_ms,
+            "step": self.step,
+        }
+
+    def log_stats(self):
+        stats = self.stats()
+        logger.info("Gun rotation cache: %d sprites, %.1f MB, "
+                    "built in %.1f ms (step %.2f deg)",
+                    stats["entries"], stats["bytes"] / 2 ** 20,
+                    stats["build_ms"], stats["step"])
+
+
+rotation_caches = {}
+
+
+def rotation_cache_for(image):
+    cache = rotation_caches.get(image)
+    if cache is None:
+        cache = RotationCache(
+            image,
+            {True: (SCREEN_WIDTH / 2 - 90, SCREEN_HEIGHT - 350),
+             False: (SCREEN_WIDTH / 2 - 30, SCREEN_HEIGHT - 350)},
+            max_entries=(None if GUN_ROTATION_PRECOMPUTE
+                         else GUN_ROTATION_CACHE_SIZE))
+        if GUN_ROTATION_PRECOMPUTE:
+            cache.precompute(True, 0, 90)
+            cache.precompute(False, 270, 360)
+            cache.log_stats()
+        rotation_caches[image] = cache
+    return cache
 
 
 class Gun:
+    ASSETS = ("assets/gun/gun.png", "assets/gun/shot.png",
+              "assets/sounds/shot.wav")
+
     def __init__(self):
-        self.gun_image = pygame.transform.scale(
-            pygame.image.load("assets/gun/gun.png").convert_alpha(),
-            (200, 200))
-        self.shot_image = pygame.image.load("assets/gun/shot.png")
-        self.shot_image = pygame.transform.scale(self.shot_image, (25, 25))
+        self.gun_image = assets.scaled("assets/gun/gun.png", (200, 200))
+        self.rotations = rotation_cache_for(self.gun_image)
+        self.shot_image = assets.scaled("assets/gun/shot.png", (25, 25))
         self.gun_point = (SCREEN_WIDTH / 2, SCREEN_HEIGHT - 200)
 
-        pygame.mixer.init()
-        self.shot_sound = pygame.mixer.Sound("assets/sounds/shot.wav")
+        self.shot_sound = load_sound("assets/sounds/shot.wav")
         self.shot_sound.set_volume(0.1)
         self.shot_triggered = False
+        self.drawn_rects = []
 
     def draw(self, screen):
-        mouse_pos = pygame.mouse.get_pos()
-        clicks = pygame.mouse.get_pressed()
+        mouse_pos = pointer.get_pos()
+        clicks = pointer.get_pressed()
+        rects = []
 
         if mouse_pos[0] != self.gun_point[0]:
             slope = ((mouse_pos[1] - self.gun_point[1])
@@ -30,38 +118,38 @@ class Gun:
         angle = math.atan(slope)
         rotation = math.degrees(angle)
         if mouse_pos[0] < SCREEN_WIDTH / 2:
-            flipped_image = pygame.transform.flip(self.gun_image, True, False)
-
             if mouse_pos[1] < 600:
-                rotated_image = pygame.transform.rotate(
-                    flipped_image,
-                    90 - rotation)
-                screen.blit(rotated_image,
-                            (SCREEN_WIDTH / 2 - 90,
-                             SCREEN_HEIGHT - 350))
+                rotated_image, offset = self.rotations.get(
+                    90 - rotation, True)
+                rects.append(screen.blit(rotated_image, offset))
 
                 if clicks[0] and not self.shot_triggered:
                     self.shot_triggered = True
                     shot_x = mouse_pos[0] - self.shot_image.get_width() // 2
                     shot_y = mouse_pos[1] - self.shot_image.get_height() // 2
-                    screen.blit(self.shot_image, (shot_x, shot_y))
+                    rects.append(
+                        screen.blit(self.shot_image, (shot_x, shot_y)))
 
                     self.shot_sound.stop()
                     self.shot_sound.play()
         else:
             if mouse_pos[1] < 600:
-                rotated_image = pygame.transform.rotate(
-                    self.gun_image, 270 - rotation)
-                screen.blit(rotated_image,
-                            (SCREEN_WIDTH / 2 - 30, SCREEN_HEIGHT - 350))
+                rotated_image, offset = self.rotations.get(
+                    270 - rotation, False)
+                rects.append(screen.blit(rotated_image, offset))
 
                 if clicks[0] and not self.shot_triggered:
                     self.shot_triggered = True
                     shot_x = mouse_pos[0] - self.shot_image.get_width() // 2
                     shot_y = mouse_pos[1] - self.shot_image.get_height() // 2
-                    screen.blit(self.shot_image, (shot_x, shot_y))
+                    rects.append(
+                        screen.blit(self.shot_image, (shot_x, shot_y)))
 
                     self.shot_sound.stop()
                     self.shot_sound.play()
         if not clicks[0]:
             self.shot_triggered = False
+
+        dirty = self.drawn_rects + rects
+        self.drawn_rects = rects
+        return dirty
@@ -1,10 +1,72 @@
-from core.game import Game
+import time
+IMPORT_START = time.perf_counter()
+
+import sys  # noqa: E402
+import argparse  # noqa: E402
+import logging  # noqa: E402
+from core.game import Game, play_replay  # noqa: E402
+from core.replay import load_replay  # noqa: E402
+from core.settings import STATS_DB  # noqa: E402
+from core.startup import startup_timer  # noqa: E402
+
+startup_timer.start = IMPORT_START
+startup_timer.add("import", (time.perf_counter() - IMPORT_START) * 1000)
 
 
 def main():
-    game = Game()
+    parser = argparse.ArgumentParser(description="CI/CD Duck Hunt")
+    parser.add_argument("--headless", action="store_true",
+                        help="run without a window or audio")
+    parser.add_argument("--frames", type=int, default=3600,
+                        help="frames to simulate in headless mode")
+    parser.add_argument("--scene", default="menu",
+                        help="scene to start the headless run in")
+    parser.add_argument("--no-render", action="store_true",
+                        help="skip drawing in headless mode")
+    parser.add_argument("--profile-out", metavar="PATH",
+                        help="write frame timings to a .csv or .json file "
+                             "on exit")
+    parser.add_argument("--seed", type=int,
+                        help="seed the session's random number generator")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record the session's input to a replay file")
+    parser.add_argument("--stats", metavar="PATH", default=STATS_DB,
+                        help="SQLite file that stores finished sessions")
+    parser.add_argument("--no-stats", action="store_true",
+                        help="do not record finished sessions")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="re-run a recorded session headlessly and "
+                             "check its final score")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.replay:
+        replay = load_replay(args.replay)
+        start = time.perf_counter()
+        stats = play_replay(replay)
+        elapsed = time.perf_counter() - start
+        print(f"{replay.ticks} ticks in {elapsed:.2f}s: {stats}")
+        if stats != replay.stats():
+            print(f"mismatch, recorded {replay.stats()}")
+            sys.exit(1)
+        return
+
+    stats_path = None if args.headless or args.no_stats else args.stats
+    game = Game(headless=args.headless, profile_path=args.profile_out,
+                seed=args.seed, record_path=args.record,
+                stats_path=stats_path)
 
-    game.run()
+    if args.headless:
+        game.scene_manager.set_scene(args.scene)
+        game.startup_report()
+        start = time.perf_counter()
+        frames = game.simulate(args.frames, render=not args.no_render)
+        elapsed = time.perf_counter() - start
+        print(f"{frames} frames in {elapsed:.2f}s "
+              f"({frames / elapsed:.0f} frames/s)")
+    else:
+        game.run()
 
 
 if __name__ == "__main__":
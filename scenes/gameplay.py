@@ -0,0 +1,236 @@
+import pygame
+from entities.gun import Gun
+from entities.duck import Duck
+from entities.flock import DuckFlock
+from core.assets import assets
+from core.text import HudField
+from core.settings import (MAX_DIRTY_RECTS, PLAY_AREA, SCREEN_WIDTH,
+                           SCREEN_HEIGHT)
+from core.layers import StaticLayerCache
+from core.clock import game_clock
+from core.events import EventDispatcher
+from core.spawner import SpawnScheduler, waves
+
+
+class Rule:
+    def attach(self, engine):
+        pass
+
+    def restart(self, engine):
+        pass
+
+    def can_shoot(self, engine):
+        return True
+
+    def on_shot(self, engine):
+        pass
+
+    def finished(self, engine, elapsed):
+        return False
+
+    def quit_finishes(self, engine):
+        return False
+
+    def clock_text(self, engine, elapsed):
+        return None
+
+    def counter_text(self, engine):
+        return None
+
+
+class FreePlay(Rule):
+    def quit_finishes(self, engine):
+        return True
+
+
+class AmmoLimit(Rule):
+    def __init__(self, ammo=10):
+        self.ammo = ammo
+
+    def attach(self, engine):
+        engine.ammo = self.ammo
+
+    def restart(self, engine):
+        engine.ammo = self.ammo
+
+    def can_shoot(self, engine):
+        return engine.ammo > 0
+
+    def on_shot(self, engine):
+        engine.ammo -= 1
+
+    def finished(self, engine, elapsed):
+        return engine.ammo == 0
+
+    def counter_text(self, engine):
+        return f"{engine.ammo}"
+
+
+class TimeLimit(Rule):
+    def __init__(self, time_limit=30000):
+        self.time_limit = time_limit
+
+    def attach(self, engine):
+        engine.time_limit = self.time_limit
+
+    def finished(self, engine, elapsed):
+        return elapsed >= engine.time_limit
+
+    def clock_text(self, engine, elapsed):
+        return f"{max(0, (engine.time_limit - elapsed) / 1000.0):.1f}"
+
+
+class GameplayEngine:
+    ASSETS = ("assets/bgs/free-play-bg.png",
+              "assets/banners/free-play-banner.png",
+              ) + Duck.ASSETS + Gun.ASSETS
+
+    def __init__(self, scene_manager, mode, rules):
+        self.scene_manager = scene_manager
+        self.mode = mode
+        self.rules = tuple(rules)
+
+        self.pause_rect = pygame.Rect(670, 630, 210, 55)
+        self.restart_rect = pygame.Rect(670, 708, 210, 55)
+
+        self.events = EventDispatcher()
+        self.events.on(pygame.MOUSEBUTTONDOWN, self.on_click, 1)
+        self.events.on(pygame.KEYDOWN, self.on_escape, pygame.K_ESCAPE)
+
+        self.game_bg = assets.image("assets/bgs/free-play-bg.png")
+        self.game_bn = assets.image("assets/banners/free-play-banner.png")
+        self.layers = StaticLayerCache((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+        self.ducks = DuckFlock()
+        self.spawner = SpawnScheduler(waves[mode], self.ducks,
+                                      game_clock.get_ticks())
+
+        self.gun = Gun()
+
+        self.score = 0
+        self.hits_count = 0
+        self.shots_count = 0
+        self.start_time = game_clock.get_ticks()
+
+        self.pause_start = None
+
+        self.score_field = HudField((377, 622), 31, 'white')
+        self.clock_field = HudField((360, 659), 31, 'white')
+        self.counter_field = HudField((439, 697), 31, 'white')
+        self.hits_field = HudField((488, 738), 31, 'white')
+        self.hud_fields = (self.score_field, self.clock_field,
+                           self.counter_field, self.hits_field)
+
+        for rule in self.rules:
+            rule.attach(self)
+
+    def restart(self):
+        self.score = 0
+        self.hits_count = 0
+        self.shots_count = 0
+        self.start_time = game_clock.get_ticks()
+        self.ducks.clear()
+        self.spawner = SpawnScheduler(waves[self.mode], self.ducks,
+                                      self.start_time)
+        for rule in self.rules:
+            rule.restart(self)
+
+    def elapsed(self):
+        return game_clock.get_ticks() - self.start_time
+
+    def finished(self):
+        elapsed = self.elapsed()
+        return any(rule.finished(self, elapsed) for rule in self.rules)
+
+    def handle_events(self, events):
+        self.events.dispatch(events)
+
+    def on_click(self, event):
+        if self.restart_rect.collidepoint(event.pos):
+            self.restart()
+        elif self.pause_rect.collidepoint(event.pos):
+            self.pause()
+        else:
+            self.shoot(event.pos)
+            if self.finished():
+                self.go_to_score_scene()
+
+    def on_escape(self, event):
+        self.pause()
+
+    def shoot(self, pos):
+        if not all(rule.can_shoot(self) for rule in self.rules):
+            return
+        for rule in self.rules:
+            rule.on_shot(self)
+        self.shots_count += 1
+
+        bullet_rect = pygame.Rect(pos[0], pos[1], 1, 1)
+        for duck in self.ducks.hit(bullet_rect):
+            self.hits_count += 1
+            self.score += duck.get_score_value()
+
+    def pause(self):
+        self.pause_start = game_clock.get_ticks()
+        self.go_to_score_scene(flag=False)
+        self.scene_manager.scenes["pause"].previous_scene_name = self.mode
+        self.scene_manager.set_scene("pause")
+
+    def update(self):
+        if self.finished():
+            self.go_to_score_scene()
+            return
+
+        self.spawner.update(game_clock.get_ticks())
+        self.ducks.update(game_clock.dt)
+
+    def static_layers(self):
+        return [(self.game_bg, (0, 0)), (self.game_bn, (0, 600))]
+
+    def hud_text(self):
+        elapsed = self.elapsed()
+        clock = counter = None
+        for rule in self.rules:
+            clock = clock or rule.clock_text(self, elapsed)
+            counter = counter or rule.counter_text(self)
+        return (f"{self.score}", clock or f"{elapsed / 1000.0:.1f}",
+                counter or f"{self.shots_count}", f"{self.hits_count}")
+
+    def draw(self, screen):
+        self.layers.draw(screen, self.static_layers())
+
+        screen.set_clip(PLAY_AREA)
+        dirty = self.ducks.draw(screen, game_clock.alpha)
+        dirty += self.gun.draw(screen)
+        screen.set_clip(None)
+
+        items = []
+        for field, text in zip(self.hud_fields, self.hud_text()):
+            item, rects = field.stage(text)
+            items.append(item)
+            dirty += rects
+        screen.blits(items, doreturn=False)
+
+        if len(dirty) > MAX_DIRTY_RECTS:
+            return None
+        return dirty
+
+    def end_session(self):
+        if any(rule.quit_finishes(self) for rule in self.rules):
+            end = self.pause_start or game_clock.get_ticks()
+            self.report(end - self.start_time, record=True)
+
+    def report(self, elapsed, record):
+        score_scene = self.scene_manager.scenes["score"]
+        score_scene.set_stats(
+            time_sec=elapsed / 1000.0,
+            score=self.score,
+            hits_count=self.hits_count,
+            shots_count=self.shots_count,
+            mode=self.mode if record else None
+        )
+
+    def go_to_score_scene(self, flag=True):
+        self.report(self.elapsed(), self.finished())
+        if flag:
+            self.scene_manager.set_scene("score")
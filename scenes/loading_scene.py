@@ -0,0 +1,49 @@
+import pygame
+from core.settings import BG_COLOR, SCREEN_WIDTH, SCREEN_HEIGHT
+from core.events import EventDispatcher
+from core.text import text_renderer
+
+
+class LoadingScene:
+    ASSETS = ()
+
+    BAR_RECT = pygame.Rect(SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT // 2,
+                           400, 24)
+    LABEL_POS = (SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT // 2 - 40)
+
+    def __init__(self, scene_manager, loader, manifest, next_scene="menu"):
+        self.scene_manager = scene_manager
+        self.loader = loader
+        self.manifest = tuple(manifest)
+        self.next_scene = next_scene
+        self.progress = 0.0
+        self.drawn_progress = None
+        self.events = EventDispatcher()
+
+    def handle_events(self, events):
+        pass
+
+    def update(self):
+        self.progress = self.loader.progress(self.manifest)
+        if self.progress >= 1.0:
+            self.scene_manager.set_scene(self.next_scene)
+
+    def invalidate(self):
+        self.drawn_progress = None
+
+    def draw(self, screen):
+        if self.progress == self.drawn_progress:
+            return []
+
+        if self.drawn_progress is None:
+            screen.fill(BG_COLOR)
+            screen.blit(text_renderer.render("Loading...", 'white', 28, None),
+                        self.LABEL_POS)
+        self.drawn_progress = self.progress
+
+        pygame.draw.rect(screen, BG_COLOR, self.BAR_RECT)
+        filled = self.BAR_RECT.copy()
+        filled.width = int(self.BAR_RECT.width * self.progress)
+        pygame.draw.rect(screen, (80, 200, 80), filled)
+        pygame.draw.rect(screen, 'white', self.BAR_RECT, 2)
+        return [self.BAR_RECT]
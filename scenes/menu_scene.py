@@ -1,34 +1,51 @@
 import pygame
+from core.assets import assets
+from core.events import EventDispatcher
 
 
 class MenuScene:
+    ASSETS = ("assets/menus/main-menu.png",)
+
     def __init__(self, scene_manager):
         self.scene_manager = scene_manager
-        self.menu_bg = pygame.image.load(
-            "assets/menus/main-menu.png").convert_alpha()
+        self.preload_scenes = ("game", "ammo", "time", "settings")
+        self.menu_bg = assets.image("assets/menus/main-menu.png")
+        self.dirty = True
 
         self.settings_button_rect = pygame.Rect(460, 59, 360, 85)
         self.free_mode_rect = pygame.Rect(100, 345, 360, 85)
         self.limited_ammo_rect = pygame.Rect(100, 490, 360, 85)
         self.limited_time_rect = pygame.Rect(100, 635, 360, 85)
 
+        self.events = EventDispatcher()
+        self.events.on(pygame.MOUSEBUTTONDOWN, self.on_click, 1)
+
     def handle_events(self, events):
-        for event in events:
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = pygame.mouse.get_pos()
-                if self.settings_button_rect.collidepoint(mouse_pos):
-                    self.scene_manager.set_scene("settings")
-                elif self.free_mode_rect.collidepoint(mouse_pos):
-                    self.scene_manager.set_scene("game")
-                elif self.limited_ammo_rect.collidepoint(mouse_pos):
-                    self.scene_manager.set_scene("ammo")
-                elif self.limited_time_rect.collidepoint(mouse_pos):
-                    (self.scene_manager.scenes["time"]
-                     .start_time) = pygame.time.get_ticks()
-                    self.scene_manager.set_scene("time")
+        self.events.dispatch(events)
+
+    def on_click(self, event):
+        if self.settings_button_rect.collidepoint(event.pos):
+            self.scene_manager.set_scene("settings")
+        elif self.free_mode_rect.collidepoint(event.pos):
+            self.start_mode("game")
+        elif self.limited_ammo_rect.collidepoint(event.pos):
+            self.start_mode("ammo")
+        elif self.limited_time_rect.collidepoint(event.pos):
+            self.start_mode("time")
+
+    def start_mode(self, name):
+        self.scene_manager.scenes[name].restart()
+        self.scene_manager.set_scene(name)
 
     def update(self):
         pass
 
+    def invalidate(self):
+        self.dirty = True
+
     def draw(self, screen):
+        if not self.dirty:
+            return []
+        self.dirty = False
         screen.blit(self.menu_bg, (0, 0))
+        return [screen.get_rect()]
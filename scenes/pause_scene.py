@@ -1,32 +1,51 @@
 import pygame
+from core.assets import assets
+from core.clock import game_clock
+from core.events import EventDispatcher
 
 
 class PauseScene:
+    ASSETS = ("assets/menus/pause-menu.png",)
+
     def __init__(self, scene_manager):
         self.scene_manager = scene_manager
-        self.pause_bg = pygame.image.load(
-            "assets/menus/pause-menu.png"
-        ).convert_alpha()
+        self.preload_scenes = ("score",)
+        self.pause_bg = assets.image("assets/menus/pause-menu.png")
+        self.dirty = True
 
         self.return_rect = pygame.Rect(410, 417, 390, 73)
         self.score_menu_rect = pygame.Rect(510, 560, 395, 70)
 
         self.previous_scene_name = "game"
 
+        self.events = EventDispatcher()
+        self.events.on(pygame.MOUSEBUTTONDOWN, self.on_click, 1)
+
     def handle_events(self, events):
-        for event in events:
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = event.pos
-                if self.return_rect.collidepoint(mouse_pos):
-                    self.resume_previous_scene()
-                elif self.score_menu_rect.collidepoint(mouse_pos):
-                    self.scene_manager.set_scene("score")
+        self.events.dispatch(events)
+
+    def on_click(self, event):
+        if self.return_rect.collidepoint(event.pos):
+            self.resume_previous_scene()
+        elif self.score_menu_rect.collidepoint(event.pos):
+            prev_scene = self.scene_manager.scenes.get(
+                self.previous_scene_name)
+            if hasattr(prev_scene, "end_session"):
+                prev_scene.end_session()
+            self.scene_manager.set_scene("score")
 
     def update(self):
         pass
 
+    def invalidate(self):
+        self.dirty = True
+
     def draw(self, screen):
+        if not self.dirty:
+            return []
+        self.dirty = False
         screen.blit(self.pause_bg, (0, 0))
+        return [screen.get_rect()]
 
     def resume_previous_scene(self):
         prev_scene = self.scene_manager.scenes[
@@ -34,7 +53,7 @@ class PauseScene:
 
         if (hasattr(prev_scene, 'pause_start') and
                 prev_scene.pause_start is not None):
-            paused_duration = pygame.time.get_ticks() - prev_scene.pause_start
+            paused_duration = game_clock.get_ticks() - prev_scene.pause_start
             prev_scene.start_time += paused_duration
             prev_scene.pause_start = None
 
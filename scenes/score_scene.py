@@ -1,50 +1,90 @@
 import pygame
+from core.assets import assets
+from core.events import EventDispatcher
+from core.results import results
+from core.settings import DIFFICULTY_LEVEL
+from core.text import HudField
 
 
 class ScoreScene:
+    ASSETS = ("assets/menus/score-menu.png",)
+
     def __init__(self, scene_manager):
         self.scene_manager = scene_manager
-        self.score_bg = pygame.image.load(
-            "assets/menus/score-menu.png"
-        ).convert_alpha()
+        self.score_bg = assets.image("assets/menus/score-menu.png")
+        self.dirty = True
 
         self.main_menu_rect = pygame.Rect(225, 552, 420, 95)
 
+        self.events = EventDispatcher()
+        self.events.on(pygame.MOUSEBUTTONDOWN, self.on_click, 1)
+
         self.final_time = 0
         self.score = 0
         self.hits_count = 0
         self.shots_count = 0
 
-    def set_stats(self, time_sec, score, hits_count, shots_count):
+        self.mode = None
+        self.recorded = True
+        self.standing = None
+        self.rank = None
+        self.best = None
+
+        self.score_field = HudField((282, 158), 60, '#50757c')
+        self.hits_field = HudField((378, 240), 60, '#50757c')
+        self.shots_field = HudField((277, 321), 60, '#50757c')
+        self.time_field = HudField((155, 403), 60, '#50757c')
+        self.standing_field = HudField((40, 475), 40, '#50757c')
+
+    def set_stats(self, time_sec, score, hits_count, shots_count,
+                  mode=None):
         self.final_time = time_sec
         self.score = score
         self.hits_count = hits_count
         self.shots_count = shots_count
+        self.mode = mode
+        self.recorded = mode is None
+        self.dirty = True
 
     def handle_events(self, events):
-        for event in events:
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = event.pos
-                if self.main_menu_rect.collidepoint(mouse_pos):
-                    self.scene_manager.scenes["game"].restart()
-                    self.scene_manager.scenes["ammo"].restart()
-                    self.scene_manager.scenes["time"].restart()
-                    self.scene_manager.set_scene("menu")
+        self.events.dispatch(events)
+
+    def on_click(self, event):
+        if self.main_menu_rect.collidepoint(event.pos):
+            scenes = self.scene_manager.scenes
+            for name in ("game", "ammo", "time"):
+                if scenes.loaded(name):
+                    scenes[name].restart()
+            self.scene_manager.set_scene("menu")
 
     def update(self):
-        pass
+        if not self.recorded:
+            self.recorded = True
+            self.rank = self.best = None
+            self.standing = results.record(
+                self.mode, DIFFICULTY_LEVEL[0], self.score, self.hits_count,
+                self.shots_count, self.final_time)
 
-    def draw(self, screen):
-        screen.blit(self.score_bg, (0, 0))
+        if self.standing is not None and self.standing.done():
+            if self.standing.exception() is None:
+                self.rank, self.best = self.standing.result()
+            self.standing = None
+            self.dirty = True
 
-        font = pygame.font.Font("assets/font/PT-Serif-Bold-Italic.ttf", 60)
+    def invalidate(self):
+        self.dirty = True
 
-        time_surface = font.render(f"{self.final_time:.1f}", True, '#50757c')
-        score_surface = font.render(f"{self.score}", True, '#50757c')
-        hits_surface = font.render(f"{self.hits_count}", True, '#50757c')
-        shots_surface = font.render(f"{self.shots_count}", True, '#50757c')
+    def draw(self, screen):
+        if not self.dirty:
+            return []
+        self.dirty = False
+        screen.blit(self.score_bg, (0, 0))
 
-        screen.blit(score_surface, (282, 158))
-        screen.blit(hits_surface, (378, 240))
-        screen.blit(shots_surface, (277, 321))
-        screen.blit(time_surface, (155, 403))
+        self.score_field.draw(screen, f"{self.score}")
+        self.hits_field.draw(screen, f"{self.hits_count}")
+        self.shots_field.draw(screen, f"{self.shots_count}")
+        self.time_field.draw(screen, f"{self.final_time:.1f}")
+        if self.rank is not None:
+            self.standing_field.draw(
+                screen, f"Місце: {self.rank}   Рекорд: {self.best}")
+        return [screen.get_rect()]
@@ -1,13 +1,16 @@
 import pygame
 from core.settings import DIFFICULTY_LEVEL
+from core.assets import assets
+from core.events import EventDispatcher
 
 
 class SettingsMenu:
+    ASSETS = ("assets/menus/settings-menu.png",)
+
     def __init__(self, scene_manager):
         self.scene_manager = scene_manager
-        self.settings_bg = pygame.image.load(
-            "assets/menus/settings-menu.png"
-        ).convert_alpha()
+        self.settings_bg = assets.image("assets/menus/settings-menu.png")
+        self.dirty = True
 
         self.difficulty = -1
 
@@ -15,27 +18,37 @@ class SettingsMenu:
         self.medium_mode_rect = pygame.Rect(418, 453, 366, 98)
         self.hard_mode_rect = pygame.Rect(418, 594, 366, 98)
 
+        self.events = EventDispatcher()
+        self.events.on(pygame.MOUSEBUTTONDOWN, self.on_click, 1)
+
     def handle_events(self, events):
-        for event in events:
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = event.pos
-                if self.easy_mode_rect.collidepoint(mouse_pos):
-                    DIFFICULTY_LEVEL[0] = 0
-                    self.difficulty = 0
-                    self.scene_manager.set_scene("menu")
-
-                if self.medium_mode_rect.collidepoint(mouse_pos):
-                    DIFFICULTY_LEVEL[0] = 1
-                    self.difficulty = 1
-                    self.scene_manager.set_scene("menu")
-
-                if self.hard_mode_rect.collidepoint(mouse_pos):
-                    DIFFICULTY_LEVEL[0] = 2
-                    self.difficulty = 2
-                    self.scene_manager.set_scene("menu")
+        self.events.dispatch(events)
+
+    def on_click(self, event):
+        if self.easy_mode_rect.collidepoint(event.pos):
+            DIFFICULTY_LEVEL[0] = 0
+            self.difficulty = 0
+            self.scene_manager.set_scene("menu")
+
+        if self.medium_mode_rect.collidepoint(event.pos):
+            DIFFICULTY_LEVEL[0] = 1
+            self.difficulty = 1
+            self.scene_manager.set_scene("menu")
+
+        if self.hard_mode_rect.collidepoint(event.pos):
+            DIFFICULTY_LEVEL[0] = 2
+            self.difficulty = 2
+            self.scene_manager.set_scene("menu")
 
     def update(self):
         pass
 
+    def invalidate(self):
+        self.dirty = True
+
     def draw(self, screen):
+        if not self.dirty:
+            return []
+        self.dirty = False
         screen.blit(self.settings_bg, (0, 0))
+        return [screen.get_rect()]
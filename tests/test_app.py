@@ -2,19 +2,48 @@ import pytest
 import pygame
 import random
 import os
-
-from core.settings import DIFFICULTY_LEVEL
+import time
+import logging
+import json
+import sqlite3
+from concurrent.futures import Future
+
+from core.settings import (DIFFICULTY_LEVEL, AUDIO_ENABLED,
+                           MAX_TICKS_PER_FRAME, HIT_TEST_MODE)
 from core.scene_manager import SceneManager
-from core.game import Game
+from core.assets import AssetRegistry, assets
+from core.text import HudField, TextRenderer, text_renderer
+from core.spatial_hash import SpatialHash
+from core.audio import NullSound, load_sound
+from core.pointer import pointer
+from core.clock import game_clock
+from core.layers import StaticLayerCache
+from core.profiler import FrameProfiler, ProfilerOverlay
+from core.startup import StartupTimer
+from core.events import EventDispatcher, coalesce
+from core.loader import AssetLoader
+from core.assetpack import AssetPack, build, resource_path
+from core.game import Game, play_replay
+from core import balance
+from core.rng import rng
+from core.spawner import SpawnScheduler, difficulty_tier, sample, waves
+from core.replay import Replay, decode_replay, load_replay
+from core.results import QUERY, ResultsStore, connect, session_row
 from scenes.free_gamemode_scene import GameScene
+from scenes.gameplay import AmmoLimit, GameplayEngine, TimeLimit
 from scenes.limited_ammo_gamemode_scene import LimitedAmmoGameModeScene
 from scenes.limited_time_gamemode_scene import LimitedTimeGameModeScene
 from scenes.menu_scene import MenuScene
 from scenes.pause_scene import PauseScene
 from scenes.score_scene import ScoreScene
 from scenes.settings_scene import SettingsMenu
-from entities.duck import Duck
-from entities.gun import Gun
+from entities.duck import Duck, cull_stats
+from entities.flock import DuckFlock
+from entities.duck_pool import DuckPool, duck_pool
+from entities.gun import (Gun, RotationCache, rotation_cache_for,
+                          rotation_caches)
+from benchmarks.harness import compare, load_results, measure, write_results
+from benchmarks.bench_sessions import run_session
 
 class TestCore:
     def test_scene_manager_add_and_set_scene(self, scene_manager):
@@ -74,6 +103,17 @@ def init_pygame():
     pygame.quit()
 
 
+@pytest.fixture(autouse=True)
+def clear_assets():
+    assets.clear()
+    text_renderer.clear()
+    duck_pool.clear()
+    yield
+    assets.clear()
+    text_renderer.clear()
+    duck_pool.clear()
+
+
 class TestScenes:
     def test_game_scene_basic(self, scene_manager):
         game_scene = GameScene(scene_manager)
@@ -169,7 +209,9 @@ class TestsMenuScene:
             "pygame.image.load", return_value=pygame.Surface((100, 100))
         )
         scene_manager_mock = mocker.Mock()
-        scene_manager_mock.scenes = {"time": mocker.Mock()}
+        scene_manager_mock.scenes = {"game": mocker.Mock(),
+                                     "ammo": mocker.Mock(),
+                                     "time": mocker.Mock()}
         return MenuScene(scene_manager_mock)
 
     def test_handle_events_settings(self, menu_scene, mocker):
@@ -190,6 +232,7 @@ class TestsMenuScene:
             pygame.MOUSEBUTTONDOWN, button=1, pos=mock_pos
         )
         menu_scene.handle_events([event])
+        menu_scene.scene_manager.scenes["game"].restart.assert_called_once()
         menu_scene.scene_manager.set_scene.assert_called_once_with("game")
 
     def test_handle_events_limited_ammo(self, menu_scene, mocker):
@@ -201,20 +244,19 @@ class TestsMenuScene:
         )
         menu_scene.handle_events([event])
 
+        menu_scene.scene_manager.scenes["ammo"].restart.assert_called_once()
         menu_scene.scene_manager.set_scene.assert_called_once_with("ammo")
 
     def test_handle_events_limited_time(self, menu_scene, mocker):
         mock_pos = (100 + 10, 635 + 10)
         mocker.patch('pygame.mouse.get_pos', return_value=mock_pos)
 
-        mocker.patch('pygame.time.get_ticks', return_value=123456)
-
         event = pygame.event.Event(
             pygame.MOUSEBUTTONDOWN, button=1, pos=mock_pos
         )
         menu_scene.handle_events([event])
 
-        assert menu_scene.scene_manager.scenes["time"].start_time == 123456
+        menu_scene.scene_manager.scenes["time"].restart.assert_called_once()
         menu_scene.scene_manager.set_scene.assert_called_once_with("time")
 
     def test_handle_events_no_click(self, menu_scene, mocker):
@@ -285,18 +327,18 @@ class TestsFreeGameScene:
         free_game.score = 150
         free_game.hits_count = 3
         free_game.shots_count = 5
-        free_game.ducks = [Duck(100, 100, 45)]
+        free_game.ducks.append(Duck(100, 100, 45))
 
         free_game.restart()
 
         assert free_game.score == 0
         assert free_game.hits_count == 0
         assert free_game.shots_count == 0
-        assert free_game.ducks == []
+        assert len(free_game.ducks) == 0
 
     def test_handle_events_click_restart(self, free_game, mocker):
-        self.event_mock = mocker.Mock(type=pygame.MOUSEBUTTONDOWN, button=1)
-        mocker.patch('pygame.mouse.get_pos', return_value=(700, 720))
+        self.event_mock = mocker.Mock(type=pygame.MOUSEBUTTONDOWN, button=1,
+                                      pos=(700, 720))
         self.restart_mock = mocker.patch.object(free_game, 'restart')
 
         free_game.handle_events([self.event_mock])
@@ -304,8 +346,8 @@ class TestsFreeGameScene:
         self.restart_mock.assert_called_once()
 
     def test_handle_events_click_pause(self, free_game, mocker):
-        self.event_mock = mocker.Mock(type=pygame.MOUSEBUTTONDOWN, button=1)
-        mocker.patch('pygame.mouse.get_pos', return_value=(700, 640))
+        self.event_mock = mocker.Mock(type=pygame.MOUSEBUTTONDOWN, button=1,
+                                      pos=(700, 640))
         free_game.handle_events([self.event_mock])
 
         free_game.scene_manager.set_scene.assert_called_once_with("pause")
@@ -314,21 +356,18 @@ class TestsFreeGameScene:
         )
 
     def test_handle_events_shoot_duck(self, free_game, mocker):
-        self.duck_mock = mocker.Mock()
-        self.duck_mock.check_collision.return_value = True
-        self.duck_mock.get_score_value.return_value = 10
-
-        free_game.ducks.append(self.duck_mock)
+        self.duck = Duck(80, 80, 0)
+        free_game.ducks.append(self.duck)
 
-        self.event_mock = mocker.Mock(type=pygame.MOUSEBUTTONDOWN, button=1)
-        mocker.patch('pygame.mouse.get_pos', return_value=(100, 100))
+        self.event_mock = mocker.Mock(type=pygame.MOUSEBUTTONDOWN, button=1,
+                                      pos=(100, 100))
 
         free_game.handle_events([self.event_mock])
 
-        assert free_game.score in {10, 35, 45}
+        assert free_game.score == self.duck.get_score_value()
         assert free_game.hits_count == 1
         assert free_game.shots_count == 1
-        assert self.duck_mock not in free_game.ducks
+        assert self.duck not in list(free_game.ducks)
 
     def test_go_to_score_scene(self, free_game):
         current_time_ms = pygame.time.get_ticks() - free_game.start_time
@@ -346,9 +385,9 @@ class TestsFreeGameScene:
     def test_update_spawns_ducks(self, free_game, mocker):
         mocker.patch(
             'pygame.time.get_ticks',
-            return_value=free_game.last_spawn_time + 2500,
+            return_value=free_game.spawner.start + 2500,
         )
-        mocker.patch('random.choice', return_value=True)
+        mocker.patch('random.choice', side_effect=lambda seq: seq[0])
         mocker.patch('random.randint', return_value=100)
 
         self.initial_duck_count = len(free_game.ducks)
@@ -388,8 +427,8 @@ class TestsLimitedTimeScene:
         assert len(lim_time.ducks) == 0
 
     def test_handle_events_click_restart(self, lim_time, mocker):
-        event = mocker.Mock(type=pygame.MOUSEBUTTONDOWN, button=1)
-        mocker.patch('pygame.mouse.get_pos', return_value=(700, 720))
+        event = mocker.Mock(type=pygame.MOUSEBUTTONDOWN, button=1,
+                            pos=(700, 720))
         mocker.patch.object(lim_time, 'restart')
         lim_time.handle_events([event])
         lim_time.restart.assert_called_once()
@@ -432,8 +471,8 @@ class TestsLimitedAmmoScene:
         assert lim_ammo.ducks == []
 
     def test_handle_events_ammo_decrease(self, lim_ammo, mocker):
-        event = mocker.Mock(type=pygame.MOUSEBUTTONDOWN, button=1)
-        mocker.patch('pygame.mouse.get_pos', return_value=(0, 0))
+        event = mocker.Mock(type=pygame.MOUSEBUTTONDOWN, button=1,
+                            pos=(0, 0))
         lim_ammo.ammo = 10
 
         lim_ammo.handle_events([event])
@@ -653,3 +692,1502 @@ class TestDuck:
         assert duck.check_collision(r_intersect), "Має перетнутися з качкою."
         r_no_intersect = pygame.Rect(500, 500, 30, 30)
         assert not duck.check_collision(r_no_intersect), "Не має перетинатися."
+
+
+class TestAssetRegistry:
+    def test_image_loaded_once(self, mocker):
+        load = mocker.patch(
+            'pygame.image.load', return_value=pygame.Surface((100, 100))
+        )
+        registry = AssetRegistry()
+        first = registry.image("assets/targets/1.png")
+        second = registry.image("assets/targets/1.png")
+        assert first is second
+        load.assert_called_once_with(resource_path("assets/targets/1.png"))
+
+    def test_scaled_cached(self):
+        registry = AssetRegistry()
+        first = registry.scaled("assets/targets/1.png", (120, 100))
+        second = registry.scaled("assets/targets/1.png", (120, 100))
+        assert first is second
+        assert first.get_size() == (120, 100)
+
+    def test_scaled_lru_eviction(self):
+        registry = AssetRegistry(max_scaled=2)
+        registry.scaled("assets/targets/1.png", (50, 30))
+        registry.scaled("assets/targets/1.png", (60, 40))
+        registry.scaled("assets/targets/1.png", (50, 30))
+        registry.scaled("assets/targets/1.png", (70, 50))
+        keys = [size for _, size in registry.scaled_images]
+        assert keys == [(50, 30), (70, 50)]
+
+    def test_ducks_share_sprites(self, reset_difficulty):
+        DIFFICULTY_LEVEL[0] = 0
+        random.seed(7)
+        first = Duck(0, 100, 0, direction="left")
+        random.seed(7)
+        second = Duck(0, 100, 0, direction="left")
+        assert first.image_up is second.image_up
+        assert first.image_down is second.image_down
+
+
+class TestTextRenderer:
+    def test_font_created_once(self):
+        renderer = TextRenderer()
+        assert renderer.font(31) is renderer.font(31)
+        assert renderer.font(31) is not renderer.font(60)
+
+    def test_render_hits_and_misses(self):
+        renderer = TextRenderer()
+        first = renderer.render("10", 'white', 31)
+        second = renderer.render("10", 'white', 31)
+        renderer.render("10", '#50757c', 31)
+        assert first is second
+        assert renderer.stats()["hits"] == 1
+        assert renderer.stats()["misses"] == 2
+
+    def test_render_bounded(self):
+        renderer = TextRenderer(max_surfaces=3)
+        for value in range(10):
+            renderer.render(f"{value}", 'white', 31)
+        assert len(renderer.surfaces) == 3
+
+    def test_hud_field_rerenders_on_change(self, mocker):
+        renderer = TextRenderer()
+        render = mocker.spy(renderer, 'render')
+        field = HudField((0, 0), 31, 'white', renderer)
+        screen = pygame.Surface((200, 100))
+        field.draw(screen, "1")
+        field.draw(screen, "1")
+        field.draw(screen, "2")
+        assert render.call_count == 2
+
+
+class TestDuckFlock:
+    def test_update_matches_duck(self, reset_difficulty):
+        DIFFICULTY_LEVEL[0] = 2
+        random.seed(3)
+        ducks = [Duck(random.randint(-200, 800), random.randint(50, 500),
+                      random.randint(-30, 30), direction="left")
+                 for _ in range(20)]
+        random.seed(3)
+        twins = [Duck(random.randint(-200, 800), random.randint(50, 500),
+                      random.randint(-30, 30), direction="left")
+                 for _ in range(20)]
+        flock = DuckFlock()
+        for twin in twins:
+            flock.append(twin)
+
+        random.seed(11)
+        for _ in range(300):
+            for duck in ducks:
+                duck.update()
+        random.seed(11)
+        for _ in range(300):
+            flock.update()
+
+        for duck, twin in zip(ducks, flock):
+            assert twin.x == pytest.approx(duck.x)
+            assert twin.y == pytest.approx(duck.y)
+            assert twin.image is duck.image
+
+    def test_hit_swap_removes(self):
+        flock = DuckFlock(capacity=2)
+        ducks = [Duck(x, 100, 0) for x in (0, 300, 600)]
+        for duck in ducks:
+            flock.append(duck)
+
+        target = ducks[1]
+        killed = flock.hit(pygame.Rect(target.x + (target.size + 20) // 2,
+                                       target.y + target.size // 2, 1, 1))
+
+        assert killed == [ducks[1]]
+        assert len(flock) == 2
+        assert list(flock) == [ducks[0], ducks[2]]
+        assert flock.x[1] == 600
+
+    def test_hit_kills_all_overlapping(self):
+        flock = DuckFlock()
+        flock.append(Duck(100, 100, 0))
+        flock.append(Duck(110, 105, 0))
+        flock.append(Duck(600, 100, 0))
+        assert len(flock.hit(pygame.Rect(130, 120, 1, 1))) == 2
+        assert len(flock) == 1
+
+    def test_collide_matches_check_collision(self):
+        flock = DuckFlock()
+        duck = Duck(-10.6, 50.4, 0)
+        flock.append(duck)
+        for point in [(-11, 60), (-10, 60), (0, 50), (0, 49)]:
+            rect = pygame.Rect(point[0], point[1], 1, 1)
+            assert (len(flock.collide(rect)) == 1) == (
+                duck.check_collision(rect))
+
+
+class TestSpatialHash:
+    def test_query_point(self):
+        grid = SpatialHash(cell_size=64)
+        grid.rebuild([0, 100, 500], [0, 100, 500], [50, 300, 10],
+                     [50, 300, 10])
+        assert grid.query_point(10, 10) == [0]
+        assert grid.query_point(390, 390) == [1]
+        assert grid.query_point(50, 10) == []
+        assert grid.query_point(-5, -5) == []
+
+    def test_query_points_union(self):
+        grid = SpatialHash(cell_size=64)
+        grid.rebuild([0, 40, 500], [0, 0, 500], [50, 50, 10], [50, 50, 10])
+        assert grid.query_points([(45, 10), (505, 505)]) == [0, 1, 2]
+
+    def test_discard_and_move(self):
+        grid = SpatialHash(cell_size=64)
+        grid.rebuild([0, 200, 400], [0, 0, 0], [50, 50, 50], [50, 50, 50])
+        grid.discard(0)
+        grid.move(2, 0)
+        assert grid.query_point(10, 10) == []
+        assert grid.query_point(410, 10) == [0]
+
+    def test_matches_linear_scan(self):
+        rng = random.Random(5)
+        rects = [pygame.Rect(rng.randint(-200, 1000), rng.randint(0, 600),
+                             rng.randint(50, 140), rng.randint(30, 120))
+                 for _ in range(500)]
+        grid = SpatialHash()
+        grid.rebuild([r.x for r in rects], [r.y for r in rects],
+                     [r.w for r in rects], [r.h for r in rects])
+        for _ in range(200):
+            x, y = rng.randint(0, 900), rng.randint(0, 600)
+            expected = [i for i, r in enumerate(rects)
+                        if r.colliderect(pygame.Rect(x, y, 1, 1))]
+            assert grid.query_point(x, y) == expected
+
+
+class TestHeadless:
+    @pytest.fixture
+    def headless_game(self):
+        audio_enabled = AUDIO_ENABLED[0]
+        game = Game(headless=True)
+        yield game
+        AUDIO_ENABLED[0] = audio_enabled
+
+    def test_simulate_spawns_ducks(self, headless_game):
+        headless_game.scene_manager.set_scene("game")
+        frames = headless_game.simulate(300, render=False)
+        assert frames == 300
+        assert len(headless_game.scene_manager.scenes["game"].ducks) > 0
+        assert pointer.scripted is False
+
+    def test_scripted_click(self, headless_game):
+        scene = headless_game.scene_manager.scenes["game"]
+        headless_game.scene_manager.set_scene("game")
+        click = pygame.event.Event(
+            pygame.MOUSEBUTTONDOWN, button=1, pos=(100, 100)
+        )
+        headless_game.simulate(3, script={1: [click]})
+        assert scene.shots_count == 1
+
+    def test_quit_stops_simulation(self, headless_game):
+        quit_event = pygame.event.Event(pygame.QUIT, {})
+        frames = headless_game.simulate(100, script={5: [quit_event]})
+        assert frames == 6
+        assert headless_game.running is False
+
+    def test_null_sound_without_audio(self, headless_game):
+        assert isinstance(load_sound("assets/sounds/shot.wav"), NullSound)
+
+
+class TestFixedTimestep:
+    @pytest.fixture
+    def headless_game(self):
+        audio_enabled = AUDIO_ENABLED[0]
+        game = Game(headless=True, tick_rate=50)
+        yield game
+        AUDIO_ENABLED[0] = audio_enabled
+
+    def test_flock_independent_of_tick_rate(self):
+        coarse = DuckFlock()
+        fine = DuckFlock()
+        random.seed(4)
+        coarse.append(Duck(100, 300, 10, direction="left"))
+        random.seed(4)
+        fine.append(Duck(100, 300, 10, direction="left"))
+        for _ in range(30):
+            coarse.update(1.0)
+        for _ in range(60):
+            fine.update(0.5)
+        assert fine.x[0] == pytest.approx(coarse.x[0], abs=2)
+        assert fine.y[0] == pytest.approx(coarse.y[0], abs=2)
+
+    def test_interpolated_positions(self):
+        flock = DuckFlock()
+        flock.append(Duck(100, 300, 0, direction="left"))
+        flock.update()
+        flock.update()
+        xs, _ = flock.positions(0.5)
+        assert xs[0] == pytest.approx((flock.prev_x[0] + flock.x[0]) / 2)
+
+    def test_respawn_is_not_interpolated(self):
+        flock = DuckFlock()
+        flock.append(Duck(950, 300, 0, direction="left"))
+        flock.update()
+        flock.update()
+        assert flock.prev_x[0] == flock.x[0]
+
+    def test_run_caps_ticks_per_frame(self, headless_game, mocker):
+        frames = iter([[], [pygame.event.Event(pygame.QUIT, {})]])
+        mocker.patch('pygame.event.get', side_effect=lambda: next(frames))
+        headless_game.clock = mocker.Mock()
+        headless_game.clock.tick.return_value = 1000
+        tick = mocker.spy(headless_game, 'tick')
+
+        headless_game.run()
+
+        assert tick.call_count == 2 * MAX_TICKS_PER_FRAME
+        assert game_clock.simulated is False
+
+    def test_sim_clock_drives_time_limit(self, headless_game):
+        scene = headless_game.scene_manager.scenes["time"]
+        headless_game.scene_manager.set_scene("time")
+        scene.restart()
+        headless_game.simulate(scene.time_limit // 20 + 2, render=False)
+        assert headless_game.scene_manager.active_scene is (
+            headless_game.scene_manager.scenes["score"])
+
+
+class TestDirtyRects:
+    def test_scene_manager_full_redraw_on_switch(self, scene_manager):
+        menu_scene = MenuScene(scene_manager)
+        scene_manager.add_scene("menu", menu_scene)
+        scene_manager.set_scene("menu")
+        screen = pygame.Surface((900, 800))
+        assert scene_manager.draw(screen) is None
+        assert scene_manager.draw(screen) == []
+
+    def test_static_scene_draws_once(self, scene_manager, mocker):
+        menu_scene = MenuScene(scene_manager)
+        screen = mocker.Mock()
+        menu_scene.draw(screen)
+        assert menu_scene.draw(screen) == []
+        screen.blit.assert_called_once()
+        menu_scene.invalidate()
+        menu_scene.draw(screen)
+        assert screen.blit.call_count == 2
+
+    def test_hud_field_dirty_only_on_change(self):
+        field = HudField((10, 10), 31, 'white')
+        screen = pygame.Surface((200, 100))
+        assert len(field.draw(screen, "1")) == 1
+        assert field.draw(screen, "1") == []
+        assert len(field.draw(screen, "20")) == 2
+
+    def test_flock_reports_old_and_new_bounds(self):
+        flock = DuckFlock()
+        flock.append(Duck(100, 100, 0))
+        screen = pygame.Surface((900, 800))
+        flock.draw(screen)
+        flock.update()
+        dirty = flock.draw(screen)
+        assert len(dirty) == 2
+        assert dirty[0] != dirty[1]
+
+    def test_game_presents_dirty_rects(self, mocker):
+        game = Game()
+        game.scene_manager.set_scene("menu")
+        flip = mocker.patch('pygame.display.flip')
+        update = mocker.patch('pygame.display.update')
+
+        game.render()
+        game.render()
+        assert flip.call_count == 1
+        update.assert_not_called()
+
+        game.scene_manager.set_scene("game")
+        game.render()
+        game.tick([])
+        game.render()
+        assert flip.call_count == 2
+        update.assert_called_once()
+
+    def test_expose_repaints_static_scene(self):
+        game = Game()
+        game.scene_manager.set_scene("menu")
+        try:
+            assert not pygame.event.get_blocked(pygame.WINDOWEXPOSED)
+            assert not pygame.event.get_blocked(pygame.VIDEOEXPOSE)
+            assert game.scene_manager.draw(game.screen) is None
+            assert game.scene_manager.draw(game.screen) == []
+            game.handle_window_events(
+                [pygame.event.Event(pygame.WINDOWEXPOSED)])
+            assert game.scene_manager.draw(game.screen) is None
+        finally:
+            pygame.event.set_allowed(None)
+
+    def test_overlay_outlines_rects(self, mocker):
+        game = Game()
+        mocker.patch('pygame.display.flip')
+        mocker.patch('pygame.display.update')
+        draw_rect = mocker.patch('pygame.draw.rect')
+        game.scene_manager.set_scene("game")
+        game.render()
+        game.toggle_dirty_rects()
+        game.render()
+        game.render()
+        assert draw_rect.call_count > 0
+
+
+class TestRotationCache:
+    @pytest.fixture
+    def image(self):
+        return pygame.Surface((200, 200), pygame.SRCALPHA)
+
+    def test_quantized_lookup(self, image):
+        cache = RotationCache(image, {True: (0, 0), False: (10, 0)})
+        first, offset = cache.get(30.2, False)
+        second, _ = cache.get(29.8, False)
+        assert first is second
+        assert offset == (10, 0)
+        assert cache.get(30.2, True)[0] is not first
+
+    def test_finer_step(self, image):
+        cache = RotationCache(image, {True: (0, 0), False: (0, 0)},
+                              step=0.5)
+        assert cache.get(30.2, False)[0] is not cache.get(30.6, False)[0]
+
+    def test_capped(self, image):
+        cache = RotationCache(image, {True: (0, 0), False: (0, 0)},
+                              max_entries=4)
+        for angle in range(10):
+            cache.get(angle, False)
+        assert len(cache.sprites) == 4
+
+    def test_default_cap_holds_reachable_arcs(self, image):
+        cache = RotationCache(image, {True: (0, 0), False: (0, 0)})
+
+        def sweep():
+            for angle in range(0, 91):
+                cache.get(angle, True)
+            for angle in range(270, 361):
+                cache.get(angle, False)
+
+        sweep()
+        build_ms = cache.build_ms
+        sweep()
+        assert len(cache.sprites) == 182
+        assert cache.build_ms == build_ms
+
+    def test_precompute_stats(self, image):
+        cache = RotationCache(image, {True: (0, 0), False: (0, 0)},
+                              max_entries=None)
+        cache.precompute(False, 270, 360)
+        stats = cache.stats()
+        assert stats["entries"] == 91
+        assert stats["bytes"] > 0
+        assert stats["build_ms"] > 0
+
+    def test_cache_logs_when_built(self, image, caplog, monkeypatch):
+        monkeypatch.setattr("entities.gun.GUN_ROTATION_PRECOMPUTE", True)
+        caplog.set_level(logging.INFO, logger="entities.gun")
+        cache = rotation_cache_for(image)
+        try:
+            assert rotation_cache_for(image) is cache
+            messages = [record.getMessage() for record in caplog.records]
+            assert messages == [
+                f"Gun rotation cache: {len(cache.sprites)} sprites, "
+                f"{cache.stats()['bytes'] / 2 ** 20:.1f} MB, built in "
+                f"{cache.build_ms:.1f} ms (step {cache.step:.2f} deg)"]
+            assert len(cache.sprites) > 0
+        finally:
+            rotation_caches.pop(image, None)
+
+    def test_lazy_cache_logs_after_session(self, caplog):
+        audio_enabled = AUDIO_ENABLED[0]
+        caplog.set_level(logging.INFO, logger="entities.gun")
+        game = Game(headless=True)
+        AUDIO_ENABLED[0] = audio_enabled
+        game.scene_manager.set_scene("game")
+        cache = game.scene_manager.active_scene.gun.rotations
+        assert not caplog.records
+        game.simulate(5)
+        messages = [record.getMessage() for record in caplog.records]
+        assert len(cache.sprites) > 0
+        assert (f"Gun rotation cache: {len(cache.sprites)} sprites, "
+                f"{cache.stats()['bytes'] / 2 ** 20:.1f} MB, built in "
+                f"{cache.build_ms:.1f} ms (step {cache.step:.2f} deg)"
+                in messages)
+
+
+class TestStaticLayers:
+    @pytest.fixture
+    def layers(self):
+        background = pygame.Surface((900, 800), pygame.SRCALPHA)
+        background.fill((10, 20, 30, 255))
+        banner = pygame.Surface((900, 200), pygame.SRCALPHA)
+        banner.fill((200, 100, 0, 255))
+        return [(background, (0, 0)), (banner, (0, 600))]
+
+    def test_composited_once(self, layers):
+        cache = StaticLayerCache((900, 800))
+        first = cache.composite(layers)
+        assert cache.composite(layers) is first
+        assert not first.get_flags() & pygame.SRCALPHA
+        assert first.get_at((10, 700))[:3] == (200, 100, 0)
+
+    def test_rebuilt_when_layers_change(self, layers):
+        cache = StaticLayerCache((900, 800))
+        first = cache.composite(layers)
+        other = [layers[0], (pygame.Surface((900, 200)), (0, 600))]
+        assert cache.composite(other) is not first
+
+    def test_rebuilt_when_display_changes(self, layers):
+        cache = StaticLayerCache((900, 800))
+        first = cache.composite(layers)
+        pygame.display.set_mode((2, 2))
+        assert cache.composite(layers) is not first
+        pygame.display.set_mode((1, 1))
+
+    def test_ducks_clipped_to_play_area(self, scene_manager):
+        game_scene = GameScene(scene_manager)
+        game_scene.ducks.append(Duck(100, 580, 0))
+        screen = pygame.Surface((900, 800))
+        dirty = game_scene.draw(screen)
+        assert all(rect.bottom <= 600 for rect in dirty
+                   if rect.top < 600)
+
+
+class TestProfiler:
+    def test_ring_buffer_wraps(self):
+        profiler = FrameProfiler(size=4)
+        for value in range(6):
+            profiler.add("update", value)
+            profiler.end_frame()
+        assert profiler.history("update").tolist() == [2, 3, 4, 5]
+
+    def test_percentiles(self):
+        profiler = FrameProfiler(size=100)
+        for value in range(100):
+            profiler.add("draw", value)
+            profiler.end_frame()
+        p50, p95, p99 = profiler.percentiles("draw")
+        assert p50 == pytest.approx(49.5)
+        assert p95 == pytest.approx(94.05)
+        assert p99 == pytest.approx(98.01)
+
+    def test_missing_phases_skip_percentiles(self, tmp_path):
+        profiler = FrameProfiler(size=10)
+        for frame in range(10):
+            if frame % 2:
+                profiler.add("game.draw", 4.0)
+            profiler.end_frame()
+        assert profiler.percentiles("game.draw") == (4.0, 4.0, 4.0)
+        assert profiler.percentiles("frame") == (0.0, 0.0, 0.0)
+
+        path = tmp_path / "profile.json"
+        profiler.dump(str(path))
+        frames = json.loads(path.read_text())["frames"]
+        assert [row["game.draw"] for row in frames[:2]] == [None, 4.0]
+
+    def test_scene_manager_times_each_phase(self, mocker):
+        profiler = FrameProfiler()
+        manager = SceneManager(profiler)
+        manager.add_scene("fake", mocker.Mock())
+        manager.set_scene("fake")
+        manager.update([])
+        manager.draw(mocker.Mock())
+        assert {"fake.handle_events", "fake.update",
+                "fake.draw"} <= set(profiler.current)
+
+    @pytest.mark.parametrize("suffix", [".csv", ".json"])
+    def test_dump(self, tmp_path, suffix):
+        profiler = FrameProfiler(size=8)
+        for _ in range(3):
+            profiler.add("update", 1.5)
+            profiler.end_frame(ducks=4)
+        path = tmp_path / f"profile{suffix}"
+        profiler.dump(str(path))
+        content = path.read_text()
+        assert "update" in content
+        assert "1.5" in content
+
+    def test_overlay_restores_background(self):
+        profiler = FrameProfiler()
+        profiler.add("update", 2.0)
+        profiler.end_frame(ducks=3)
+        overlay = ProfilerOverlay(profiler)
+        screen = pygame.Surface((900, 800))
+        screen.fill((1, 2, 3))
+        rect = overlay.draw(screen, {"ducks": 3}, "game")
+        assert rect == ProfilerOverlay.RECT
+        overlay.restore(screen)
+        assert screen.get_at(rect.center)[:3] == (1, 2, 3)
+
+    def test_overlay_fits_every_stat_line(self):
+        audio_enabled = AUDIO_ENABLED[0]
+        game = Game(headless=True)
+        AUDIO_ENABLED[0] = audio_enabled
+        game.scene_manager.set_scene("game")
+        overlay = game.profiler_overlay
+        lines = overlay._lines(game.cache_stats(), "game")
+        assert len(lines) <= overlay.LINES
+        assert 6 + 15 * overlay.LINES <= overlay.GRAPH.top - overlay.RECT.top
+
+
+class TestLazyScenes:
+    @pytest.fixture
+    def headless_game(self):
+        audio_enabled = AUDIO_ENABLED[0]
+        game = Game(headless=True)
+        yield game
+        AUDIO_ENABLED[0] = audio_enabled
+
+    def test_only_menu_is_built_at_startup(self, headless_game):
+        scenes = headless_game.scene_manager.scenes
+        assert [name for name in scenes.factories] == [
+            "pause", "game", "ammo", "time", "score", "settings"]
+        assert scenes.loaded("menu")
+        assert not scenes.loaded("game")
+        assert "game" in scenes
+
+    def test_set_scene_builds_on_first_use(self, headless_game):
+        manager = headless_game.scene_manager
+        manager.set_scene("ammo")
+        assert isinstance(manager.active_scene, LimitedAmmoGameModeScene)
+        assert manager.scenes["ammo"] is manager.active_scene
+        assert "ammo" in manager.build_ms
+
+    def test_unknown_scene(self, headless_game):
+        manager = headless_game.scene_manager
+        manager.set_scene("missing")
+        assert manager.active_scene is None
+        with pytest.raises(KeyError):
+            manager.scenes["missing"]
+
+    def test_preload_builds_one_scene_per_call(self, headless_game):
+        manager = headless_game.scene_manager
+        assert manager.preload() == "game"
+        assert manager.scenes.loaded("game")
+        assert not manager.scenes.loaded("ammo")
+        for _ in range(3):
+            manager.preload()
+        assert manager.preload() is None
+
+    def test_preload_waits_for_async_assets(self, headless_game):
+        manager = headless_game.scene_manager
+        decoded = set()
+
+        def ready(paths):
+            return set(paths) <= decoded
+
+        assert manager.preload(ready) is None
+        assert not manager.scenes.loaded("game")
+        decoded.update(GameScene.ASSETS)
+        assert manager.preload(ready) == "game"
+
+    def test_score_menu_skips_unbuilt_scenes(self, headless_game, mocker):
+        manager = headless_game.scene_manager
+        manager.set_scene("score")
+        click = mocker.Mock(type=pygame.MOUSEBUTTONDOWN, button=1,
+                            pos=manager.active_scene.main_menu_rect.center)
+        manager.active_scene.handle_events([click])
+        assert manager.active_name == "menu"
+        assert not manager.scenes.loaded("game")
+
+    def test_startup_report(self, headless_game):
+        phases = headless_game.startup_report()
+        assert {"pygame.init", "display", "asset decode",
+                "scene build"} <= set(phases)
+
+    def test_timer_accumulates(self):
+        timer = StartupTimer()
+        with timer.measure("decode"):
+            pass
+        timer.add("decode", 5.0)
+        assert timer.phases["decode"] >= 5.0
+
+
+class TestAssetLoader:
+    @pytest.fixture
+    def loader(self):
+        loader = AssetLoader(AssetRegistry())
+        yield loader
+        loader.shutdown()
+
+    def test_installs_on_main_thread_pump(self, loader):
+        path = "assets/menus/main-menu.png"
+        future = loader.request(path)
+        assert loader.request(path) is future
+        loader.wait()
+        assert future.done()
+        assert future.result() is loader.registry.images[path]
+        assert future.result().get_flags() & pygame.SRCALPHA
+
+    def test_resident_asset_resolves_immediately(self, loader):
+        path = "assets/gun/shot.png"
+        surface = loader.registry.image(path)
+        assert loader.request(path).result() is surface
+
+    def test_progress(self, loader):
+        paths = Duck.ASSETS
+        loader.request_many(paths)
+        loader.wait()
+        assert loader.progress(paths) == 1.0
+        assert loader.ready(paths)
+        assert loader.progress(()) == 1.0
+
+    def test_missing_file_sets_exception(self, loader):
+        future = loader.request("assets/missing.png")
+        loader.wait()
+        with pytest.raises(OSError):
+            future.result()
+
+    def test_sound_without_audio(self, loader):
+        audio_enabled = AUDIO_ENABLED[0]
+        AUDIO_ENABLED[0] = False
+        try:
+            future = loader.request("assets/sounds/shot.wav")
+            loader.wait()
+            assert isinstance(future.result(), NullSound)
+        finally:
+            AUDIO_ENABLED[0] = audio_enabled
+
+    def test_game_switches_to_menu_when_resident(self):
+        audio_enabled = AUDIO_ENABLED[0]
+        game = Game(headless=True, async_assets=True)
+        try:
+            assert game.scene_manager.active_name == "loading"
+            game.loader.wait()
+            game.simulate(1)
+            assert game.scene_manager.active_name == "menu"
+        finally:
+            game.loader.shutdown()
+            AUDIO_ENABLED[0] = audio_enabled
+
+
+class TestAssetPack:
+    PATHS = ["assets/targets/1.png", "assets/menus/main-menu.png",
+             "assets/sounds/shot.wav"]
+
+    @pytest.fixture
+    def pack(self, tmp_path):
+        target = tmp_path / "test.pack"
+        assert build(self.PATHS, str(target), raw_limit=1 << 20) == 3
+        pack = AssetPack(str(target))
+        yield pack
+        pack.close()
+
+    def test_raw_image_matches_png(self, pack):
+        loose = pygame.image.load(resource_path("assets/targets/1.png"))
+        packed = pack.image("assets/targets/1.png")
+        assert pack.entries["assets/targets/1.png"][0] != 0
+        assert packed.get_size() == loose.get_size()
+        assert (pygame.image.tobytes(packed, "RGBA")
+                == pygame.image.tobytes(loose, "RGBA"))
+
+    def test_large_image_kept_encoded(self, pack):
+        assert pack.entries["assets/menus/main-menu.png"][0] == 0
+        assert pack.image("assets/menus/main-menu.png").get_size() == (
+            900, 800)
+
+    def test_file_data(self, pack):
+        with open(resource_path("assets/sounds/shot.wav"), "rb") as file:
+            assert pack.file("assets/sounds/shot.wav").read() == file.read()
+
+    def test_verify_detects_corruption(self, pack, tmp_path):
+        assert pack.verify() == []
+        offset = pack.entries["assets/sounds/shot.wav"][3]
+        pack.close()
+        target = tmp_path / "test.pack"
+        data = bytearray(target.read_bytes())
+        data[offset + 100] ^= 0xFF
+        target.write_bytes(bytes(data))
+        corrupted = AssetPack(str(target))
+        assert corrupted.verify() == ["assets/sounds/shot.wav"]
+        corrupted.close()
+
+    def test_registry_reads_from_pack(self, pack, mocker):
+        load = mocker.spy(pygame.image, "load")
+        registry = AssetRegistry(pack=pack)
+        surface = registry.image("assets/targets/1.png")
+        assert surface.get_size() == (555, 320)
+        load.assert_not_called()
+
+
+class TestDuckPool:
+    def test_release_and_reuse(self):
+        pool = DuckPool()
+        duck = pool.acquire(0, 100, 0, "left")
+        pool.release(duck)
+        again = pool.acquire(900, 200, 10, "right")
+        assert again is duck
+        assert pool.stats()["created"] == 1
+        assert pool.stats()["reused"] == 1
+
+    def test_reset_matches_fresh_duck(self):
+        pool = DuckPool()
+        pool.release(pool.acquire(0, 100, 0, "left"))
+        random.seed(7)
+        recycled = pool.acquire(950, 300, 20, "right")
+        random.seed(7)
+        fresh = Duck(950, 300, 20, "right")
+        for name in Duck.__slots__:
+            if name not in ("image", "born"):
+                assert getattr(recycled, name) == getattr(fresh, name), name
+        assert recycled.image is recycled.image_up
+
+    def test_slots(self):
+        assert not hasattr(Duck(0, 0, 0), "__dict__")
+
+    def test_high_water_and_max_size(self):
+        pool = DuckPool(max_size=2)
+        ducks = [pool.acquire(0, 0, 0) for _ in range(4)]
+        pool.release_many(ducks)
+        stats = pool.stats()
+        assert stats["high_water"] == 4
+        assert stats["in_use"] == 0
+        assert stats["free"] == 2
+
+    def test_flock_returns_ducks_to_pool(self):
+        pool = DuckPool()
+        flock = DuckFlock(pool=pool)
+        for x in (0, 300, 600):
+            flock.spawn(x, 100, 0)
+        killed = flock.hit(pygame.Rect(0, 100, 50, 50))
+        assert len(killed) == 1
+        assert pool.free == killed
+        flock.clear()
+        assert len(pool.free) == 3
+        assert pool.stats()["in_use"] == 0
+
+    def test_endless_session_stays_flat(self):
+        audio_enabled = AUDIO_ENABLED[0]
+        game = Game(headless=True)
+        try:
+            game.scene_manager.set_scene("game")
+            scene = game.scene_manager.active_scene
+
+            def shoot_everything(frame, game):
+                scene.ducks.clear()
+                return []
+            game.simulate(3000, script=shoot_everything, render=False)
+        finally:
+            AUDIO_ENABLED[0] = audio_enabled
+        stats = duck_pool.stats()
+        assert stats["reused"] > 0
+        assert stats["created"] <= 2
+
+
+def aim_bot(frame, game):
+    if frame == 1:
+        return [pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1,
+                                   pos=(200, 380))]
+    ducks = getattr(game.scene_manager.active_scene, "ducks", None)
+    if frame % 20 or not ducks:
+        return []
+    duck = next(iter(ducks))
+    pos = (int(duck.x + duck.size / 2), int(duck.y + duck.size / 2))
+    return [pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0),
+                               buttons=(0, 0, 0)),
+            pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=pos)]
+
+
+class TestReplay:
+    @pytest.fixture(autouse=True)
+    def restore_audio(self):
+        audio_enabled = AUDIO_ENABLED[0]
+        yield
+        AUDIO_ENABLED[0] = audio_enabled
+
+    def test_rng_defaults_to_random_module(self, mocker):
+        mocker.patch('random.randint', return_value=42)
+        assert rng.randint(0, 10) == 42
+        state = rng.save()
+        rng.seed(3)
+        first = [rng.randint(0, 1000) for _ in range(5)]
+        rng.seed(3)
+        assert [rng.randint(0, 1000) for _ in range(5)] == first
+        rng.restore(state)
+
+    def test_game_restores_rng_and_clock(self):
+        with Game(headless=True, seed=7) as game:
+            assert game_clock.simulated is True
+            assert rng.seed_value == 7
+        assert game_clock.simulated is False
+        assert rng.seed_value is None
+
+        rng.seed(3)
+        game = Game(headless=True)
+        assert rng.seed_value is None
+        game.close()
+        game.close()
+        assert rng.seed_value == 3
+        rng.reset()
+
+    def test_seeded_sessions_match(self):
+        positions = []
+        for _ in range(2):
+            game = Game(headless=True, seed=7)
+            game.scene_manager.set_scene("game")
+            game.simulate(400, render=False)
+            scene = game.scene_manager.active_scene
+            positions.append([(duck.x, duck.y) for duck in scene.ducks])
+            game.close()
+        assert positions[0] and positions[0] == positions[1]
+
+    def test_encode_round_trip(self):
+        replay = Replay(99, 2, 60, "ammo")
+        motion = [pygame.event.Event(pygame.MOUSEMOTION, pos=(x, 5),
+                                     rel=(0, 0), buttons=(0, 0, 0))
+                  for x in range(3)]
+        click = pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1,
+                                   pos=(10, 20))
+        replay.record(3, motion + [click], alpha=0.25)
+        replay.record(70000, [pygame.event.Event(pygame.KEYDOWN,
+                                                 key=pygame.K_F2)])
+        replay.finish({"mode": "ammo", "score": 12, "hits": 2, "shots": 5})
+
+        decoded = decode_replay(replay.encode())
+        assert (decoded.seed, decoded.difficulty, decoded.tick_rate,
+                decoded.ticks, decoded.scene) == (99, 2, 60, 70001, "ammo")
+        assert decoded.stats() == replay.stats()
+        script = decoded.script()
+        assert [event.type for event in script[3]] == [
+            pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN]
+        assert script[3][0].pos == (2, 5)
+        assert script[3][1].pos == (10, 20)
+        assert script[70000][0].key == pygame.K_F2
+        assert decoded.alphas() == {3: 0.25}
+
+    def test_recorded_session_replays(self, tmp_path):
+        path = str(tmp_path / "session.replay")
+        game = Game(headless=True, seed=1234, record_path=path)
+        game.simulate(600, script=aim_bot, render=False)
+        recorded = game.session_stats()
+        game.close()
+
+        replay = load_replay(path)
+        assert replay.stats() == recorded
+        assert recorded["mode"] == "game"
+        assert recorded["hits"] > 0
+        assert play_replay(replay) == recorded
+
+    def test_replay_keeps_render_alpha(self, tmp_path):
+        path = str(tmp_path / "alpha.replay")
+        game = Game(headless=True, seed=21, record_path=path)
+        game.scene_manager.set_scene("game")
+
+        def script(frame, game):
+            ducks = game.scene_manager.active_scene.ducks
+            ducks.show(0.1)
+            if frame % 10 or not ducks:
+                return []
+            xs, ys = ducks.hit_positions()
+            pos = (int(xs[0]) + 6, int(ys[0] + ducks.size[0] / 2))
+            if not (0 <= pos[0] < 900 and 0 <= pos[1] < 600):
+                return []
+            return [pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1,
+                                       pos=pos)]
+
+        game.simulate(900, script=script, render=False)
+        recorded = game.session_stats()
+        game.close()
+
+        replay = load_replay(path)
+        assert set(replay.alphas().values()) == {0.1}
+        assert recorded["hits"] > 0
+        assert play_replay(replay) == recorded
+
+    def test_replay_starts_in_recorded_scene(self, tmp_path):
+        path = str(tmp_path / "time.replay")
+        game = Game(headless=True, seed=5, record_path=path)
+        game.scene_manager.set_scene("time")
+        game.simulate(300, script=aim_bot, render=False)
+        recorded = game.session_stats()
+        game.close()
+
+        replay = load_replay(path)
+        assert replay.scene == "time"
+        assert replay.stats() == recorded
+        assert play_replay(replay) == recorded
+
+    def test_replay_keeps_score_screen_result(self, tmp_path):
+        path = str(tmp_path / "menu.replay")
+        game = Game(headless=True, seed=9, record_path=path)
+        game.scene_manager.set_scene("ammo")
+
+        def script(frame, game):
+            scene = game.scene_manager.active_scene
+            if game.scene_manager.active_name == "score":
+                pos = scene.main_menu_rect.center
+            elif game.scene_manager.active_name == "ammo" and frame % 5 == 0:
+                pos = (450, 300)
+            else:
+                return []
+            return [pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1,
+                                       pos=pos)]
+
+        game.simulate(100, script=script, render=False)
+        assert game.scene_manager.active_name == "menu"
+        assert game.session_stats()["shots"] == 0
+        game.close()
+
+        replay = load_replay(path)
+        assert replay.stats()["shots"] == 10
+        assert play_replay(replay) == replay.stats()
+
+
+class TestBenchmarks:
+    def test_measure(self):
+        calls = []
+        result = measure(lambda: calls.append(1), number=10, repeat=3)
+        assert len(calls) == 30
+        assert result["ms"] >= result["min"] >= 0
+
+    def test_compare_flags_regressions(self):
+        baseline = {"fast": {"ms": 1.0}, "capped": {"ms": 1.0,
+                                                    "threshold": 5.0},
+                    "gone": {"ms": 1.0}}
+        results = {"fast": {"ms": 1.3}, "capped": {"ms": 4.0}}
+        assert compare(results, baseline) == [("fast", 1.3, 1.25)]
+        assert compare(results, baseline, tolerance=0.5) == []
+
+    def test_results_round_trip(self, tmp_path):
+        path = str(tmp_path / "results.json")
+        write_results({"micro.duck_update": {"ms": 0.5}}, path)
+        assert load_results(path) == {"micro.duck_update": {"ms": 0.5}}
+
+    def test_session_restores_state(self):
+        audio_enabled = AUDIO_ENABLED[0]
+        try:
+            result = run_session("ammo", 20, 2, frames=5)
+        finally:
+            AUDIO_ENABLED[0] = audio_enabled
+        assert result["ms"] > 0
+        assert DIFFICULTY_LEVEL[0] == 0
+        assert game_clock.simulated is False
+
+
+class TestHitMasks:
+    @pytest.fixture
+    def hit_mode(self):
+        mode = HIT_TEST_MODE[0]
+        yield HIT_TEST_MODE
+        HIT_TEST_MODE[0] = mode
+
+    def test_hits_follow_drawn_positions(self, hit_mode):
+        screen = pygame.Surface((900, 800))
+        for mode in ("rect", "mask"):
+            hit_mode[0] = mode
+            flock = DuckFlock()
+            duck = Duck(100, 300, 0)
+            flock.append(duck)
+            flock.update()
+            flock.draw(screen, alpha=0.0)
+
+            mask = duck.hit_mask(flock.up[0])
+            width, height = mask.get_size()
+            column, row = next((x, y) for x in range(width)
+                               for y in range(height) if mask.get_at((x, y)))
+            xs, ys = flock.hit_positions()
+            click = pygame.Rect(int(xs[0]) + column, int(ys[0]) + row, 1, 1)
+            assert flock.x[0] - xs[0] > column
+            assert flock.collide(click) == [0]
+
+            flock.draw(screen, alpha=1.0)
+            assert flock.collide(click) == []
+            flock.clear()
+
+    def test_transparent_corner(self, hit_mode):
+        duck = Duck(100, 100, 0)
+        corner = pygame.Rect(100, 100, 1, 1)
+        centre = pygame.Rect(100 + (duck.size + 20) // 2,
+                             100 + duck.size // 2, 1, 1)
+        hit_mode[0] = "mask"
+        assert not duck.check_collision(corner)
+        assert duck.check_collision(centre)
+        hit_mode[0] = "rect"
+        assert duck.check_collision(corner)
+
+    def test_masks_cached_with_sprites(self):
+        first = Duck(0, 100, 0)
+        second = Duck(0, 100, 0)
+        second.size = first.size
+        second.masks = None
+        assert first.hit_mask(True) is second.hit_mask(True)
+        assert first.hit_mask(True) is not first.hit_mask(False)
+        assert assets.stats()["masks"] == 2
+
+    def test_mask_dropped_with_scaled_sprite(self):
+        registry = AssetRegistry(max_scaled=1)
+        registry.mask("assets/targets/1.png", (50, 40))
+        registry.scaled("assets/targets/2.png", (50, 40))
+        assert registry.masks == {}
+
+    def test_flock_matches_check_collision(self, hit_mode):
+        hit_mode[0] = "mask"
+        flock = DuckFlock()
+        duck = Duck(100.7, 200.2, 0)
+        flock.append(duck)
+        for x in range(95, 100 + duck.size + 30, 7):
+            for y in range(195, 200 + duck.size + 10, 7):
+                for size in (1, 9):
+                    rect = pygame.Rect(x, y, size, size)
+                    assert (flock.collide(rect) == [0]) == (
+                        duck.check_collision(rect)), rect
+
+    def test_collide_points_uses_masks(self, hit_mode):
+        hit_mode[0] = "mask"
+        flock = DuckFlock()
+        duck = Duck(100, 100, 0)
+        flock.append(duck)
+        centre = (100 + (duck.size + 20) // 2, 100 + duck.size // 2)
+        assert flock.collide_points([(100, 100)]) == []
+        assert flock.collide_points([(100, 100), centre]) == [0]
+
+
+class TestEventDispatch:
+    def motion(self, pos):
+        return pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0),
+                                  buttons=(0, 0, 0))
+
+    def click(self, pos, button=1):
+        return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos,
+                                  button=button)
+
+    def test_coalesce_keeps_last_motion_of_each_burst(self):
+        click = self.click((5, 5))
+        events = [self.motion((1, 1)), self.motion((2, 2)), click,
+                  self.motion((3, 3)), self.motion((4, 4))]
+        kept = coalesce(events)
+        assert [event.pos for event in kept] == [(2, 2), (5, 5), (4, 4)]
+
+    def test_dispatch_by_code_then_type(self):
+        dispatcher = EventDispatcher()
+        seen = []
+        dispatcher.on(pygame.MOUSEBUTTONDOWN,
+                      lambda event: seen.append(("left", event.pos)), 1)
+        dispatcher.on(pygame.MOUSEBUTTONDOWN,
+                      lambda event: seen.append(("any", event.button)))
+        dispatcher.dispatch([self.click((1, 2)), self.click((3, 4), 3),
+                             self.motion((5, 6))])
+        assert seen == [("left", (1, 2)), ("any", 3)]
+        assert dispatcher.event_types() == {pygame.MOUSEBUTTONDOWN}
+
+    def test_key_handlers(self):
+        dispatcher = EventDispatcher()
+        seen = []
+        dispatcher.on(pygame.KEYDOWN, seen.append, pygame.K_ESCAPE)
+        escape = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_ESCAPE)
+        other = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a)
+        dispatcher.dispatch([other, escape])
+        assert seen == [escape]
+
+    def test_scene_uses_event_pos(self, mocker):
+        mocker.patch('pygame.image.load',
+                     return_value=pygame.Surface((100, 100)))
+        get_pos = mocker.patch('pygame.mouse.get_pos',
+                               return_value=(0, 0))
+        scene = GameScene(mocker.Mock())
+        scene.handle_events([self.motion((10, 10)), self.click((700, 720))])
+        assert scene.shots_count == 0
+        get_pos.assert_not_called()
+
+    def test_scene_manager_filters_queue(self):
+        pygame.display.init()
+        manager = SceneManager(base_events=(pygame.QUIT,))
+        manager.add_scene("menu", type("Scene", (), {
+            "events": EventDispatcher()})())
+        manager.scenes["menu"].events.on(pygame.MOUSEBUTTONDOWN, print, 1)
+        try:
+            manager.set_scene("menu")
+            assert not pygame.event.get_blocked(pygame.MOUSEBUTTONDOWN)
+            assert not pygame.event.get_blocked(pygame.QUIT)
+            assert pygame.event.get_blocked(pygame.MOUSEMOTION)
+        finally:
+            pygame.event.set_allowed(None)
+
+    def test_no_filter_without_base_events(self):
+        pygame.display.init()
+        manager = SceneManager()
+        manager.add_scene("menu", object())
+        manager.set_scene("menu")
+        assert manager.allowed_events is None
+        assert not pygame.event.get_blocked(pygame.MOUSEMOTION)
+
+
+class TestSpawnScheduler:
+    LANE = {"direction": "left", "x": [0, 0], "y": [100, 100],
+            "angle": 0}
+
+    def wave(self, **overrides):
+        wave = {"interval": 100, "cap": 3, "lanes": [self.LANE],
+                "bursts": []}
+        wave.update(overrides)
+        return wave
+
+    def test_stream_waits_for_interval(self):
+        flock = DuckFlock()
+        spawner = SpawnScheduler(self.wave(), flock, 1000)
+        spawner.update(1100)
+        assert len(flock) == 0
+        spawner.update(1101)
+        assert len(flock) == 1
+        assert spawner.next_due() == 1201
+
+    def test_restart_schedules_from_session_start(self, scene_manager,
+                                                  mocker):
+        scene = GameScene(scene_manager)
+        mocker.patch('pygame.time.get_ticks', return_value=50000)
+        scene.restart()
+        assert scene.spawner.start == 50000
+        assert scene.spawner.next_due() == 50000 + waves["game"]["interval"]
+
+    def test_cap_holds_spawns_back(self):
+        flock = DuckFlock()
+        spawner = SpawnScheduler(self.wave(cap=1), flock, 0)
+        spawner.update(101)
+        spawner.update(500)
+        assert len(flock) == 1
+        flock.clear()
+        spawner.update(501)
+        assert len(flock) == 1
+        assert spawner.next_due() == 601
+
+    def test_burst_spawns_with_gap(self):
+        flock = DuckFlock()
+        wave = self.wave(interval=10 ** 6, cap=100, bursts=[
+            {"at": 50, "count": 4, "gap": 10}])
+        spawner = SpawnScheduler(wave, flock, 0)
+        spawner.update(51)
+        assert len(flock) == 1
+        spawner.update(81)
+        assert len(flock) == 4
+        assert spawner.next_due() == 10 ** 6
+
+    def test_large_burst_keeps_queue_small(self):
+        flock = DuckFlock()
+        wave = self.wave(interval=10 ** 6, cap=1000, bursts=[
+            {"every": 1000, "count": 1000, "gap": 1}])
+        spawner = SpawnScheduler(wave, flock, 0)
+        spawner.update(1500)
+        assert len(flock) == 500
+        assert len(spawner.queue) == 3
+
+    def test_modes_match_default_spawning(self):
+        for mode in ("game", "ammo", "time"):
+            assert waves[mode]["interval"] == 2000
+            assert waves[mode]["cap"] == 15
+            assert [lane["direction"] for lane in waves[mode]["lanes"]] == [
+                "left", "right"]
+
+    def test_difficulty_tiers(self, reset_difficulty):
+        assert difficulty_tier(1)["speed"] == [6, 9]
+        DIFFICULTY_LEVEL[0] = 999
+        duck = Duck(0, 0, 0)
+        assert (duck.speed, duck.size) == (7, 100)
+
+    def test_sample(self, mocker):
+        mocker.patch('random.randint', return_value=4)
+        assert sample(3) == 3
+        assert sample([1, 9]) == 4
+        assert sample({"choice": [5]}) == 5
+
+
+class TestTrajectory:
+    def test_perpendicular_is_unit_vector(self):
+        duck = Duck(100, 100, 25)
+        assert duck.perp_x ** 2 + duck.perp_y ** 2 == pytest.approx(1)
+        assert (duck.perp_x * duck.dx
+                + duck.perp_y * duck.dy) == pytest.approx(0, abs=1e-9)
+
+    def test_position_at_predicts_updates(self):
+        duck = Duck(300, 300, 10)
+        duck.update()
+        assert duck.position_at(0) == pytest.approx((duck.x, duck.y))
+        predicted = duck.position_at(5)
+        for _ in range(5):
+            duck.update()
+        assert predicted == pytest.approx((duck.x, duck.y))
+
+    def test_flock_positions_at_matches_ducks(self):
+        flock = DuckFlock()
+        for angle in (-20, 0, 20):
+            flock.append(Duck(300, 300, angle))
+        flock.update()
+        xs, ys = flock.positions_at(3)
+        expected = [duck.position_at(3) for duck in flock]
+        assert xs.tolist() == pytest.approx([x for x, _ in expected])
+        assert ys.tolist() == pytest.approx([y for _, y in expected])
+        for _ in range(3):
+            flock.update()
+        assert flock.x[:3].tolist() == pytest.approx(xs.tolist())
+        assert flock.y[:3].tolist() == pytest.approx(ys.tolist())
+
+
+class TestResultsStore:
+    @pytest.fixture
+    def store(self, tmp_path):
+        store = ResultsStore()
+        store.open(str(tmp_path / "stats.db"))
+        yield store
+        store.close()
+
+    def test_standing_ranks_within_mode_and_difficulty(self, store):
+        store.record_many([
+            session_row("game", 0, score, 1, 2, 10.0, played_at=0)
+            for score in (100, 300, 200)])
+        store.record_many([session_row("game", 1, 900, 1, 1, 5.0),
+                           session_row("ammo", 0, 800, 1, 1, 5.0)])
+        assert store.record("game", 0, 250, 5, 10, 30.0).result() == (
+            2, 300)
+        assert store.standing("game", 0, 50).result() == (5, 300)
+        assert [row[0] for row in store.top("game", 0, 3).result()] == [
+            300, 250, 200]
+
+    def test_rows_keep_accuracy_and_persist(self, store, tmp_path):
+        store.record("time", 2, 40, 3, 4, 30.0).result()
+        store.record("time", 2, 10, 0, 0, 30.0).result()
+        store.close()
+        connection = connect(str(tmp_path / "stats.db"))
+        rows = connection.execute(
+            "SELECT accuracy FROM sessions ORDER BY score DESC").fetchall()
+        mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+        connection.close()
+        assert rows == [(0.75,), (0.0,)]
+        assert mode == "wal"
+
+    def test_writes_are_batched(self, store):
+        store.jobs.put((QUERY, lambda connection: time.sleep(0.05),
+                        Future()))
+        store.record_many([session_row("game", 0, i, 0, 0, 1.0)
+                           for i in range(500)])
+        store.flush()
+        assert store.written == 500
+        assert store.batches <= 2
+
+    def test_closed_store_is_a_no_op(self):
+        store = ResultsStore()
+        assert store.record("game", 0, 1, 1, 1, 1.0) is None
+        assert store.top("game", 0) is None
+        store.close()
+
+    def test_failed_write_keeps_worker_alive(self, store):
+        standing = store.record(None, 0, 1, 1, 1, 1.0)
+        with pytest.raises(sqlite3.IntegrityError):
+            standing.result(2)
+        assert store.record("game", 0, 5, 1, 1, 1.0).result(2) == (1, 5)
+        thread = store.thread
+        store.close()
+        assert not thread.is_alive()
+
+    def test_unwritable_path_runs_without_stats(self, tmp_path):
+        store = ResultsStore()
+        assert not store.open(str(tmp_path / "missing" / "stats.db"))
+        assert store.record("game", 0, 1, 1, 1, 1.0) is None
+        store.close()
+
+    def test_free_play_quit_is_recorded(self, store, scene_manager,
+                                        monkeypatch):
+        monkeypatch.setattr("scenes.score_scene.results", store)
+        score_scene = ScoreScene(scene_manager)
+        scene_manager.add_scene("score", score_scene)
+        scene_manager.add_scene("pause", PauseScene(scene_manager))
+        game_scene = GameScene(scene_manager)
+        scene_manager.add_scene("game", game_scene)
+        scene_manager.set_scene("game")
+        game_scene.score = 120
+
+        game_scene.pause()
+        scene_manager.active_scene.handle_events([pygame.event.Event(
+            pygame.MOUSEBUTTONDOWN, button=1, pos=(520, 570))])
+        assert scene_manager.active_scene is score_scene
+        score_scene.update()
+        store.flush()
+        score_scene.update()
+        assert store.written == 1
+        assert (score_scene.rank, score_scene.best) == (1, 120)
+
+    def test_paused_session_is_not_recorded(self, scene_manager):
+        scene_manager.add_scene("score", ScoreScene(scene_manager))
+        scene = LimitedAmmoGameModeScene(scene_manager)
+        scene.shoot((0, 0))
+        scene.go_to_score_scene(flag=False)
+        assert scene_manager.scenes["score"].recorded
+        scene.ammo = 0
+        scene.go_to_score_scene()
+        assert not scene_manager.scenes["score"].recorded
+
+    def test_score_scene_shows_standing(self, store, scene_manager,
+                                        monkeypatch):
+        monkeypatch.setattr("scenes.score_scene.results", store)
+        score_scene = ScoreScene(scene_manager)
+        score_scene.set_stats(12.5, 300, 4, 6, mode="ammo")
+        score_scene.update()
+        store.flush()
+        score_scene.update()
+        assert (score_scene.rank, score_scene.best) == (1, 300)
+        score_scene.draw(pygame.Surface((900, 800)))
+        assert score_scene.standing_field.text == "Місце: 1   Рекорд: 300"
+
+        score_scene.update()
+        store.flush()
+        assert store.written == 1
+
+
+class TestBalance:
+    def test_jobs_draw_reproducible_seeds(self):
+        first = balance.jobs(2, seed=5, modes=("ammo",), difficulties=(0,),
+                             bots=("perfect",))
+        assert first == balance.jobs(2, seed=5, modes=("ammo",),
+                                     difficulties=(0,), bots=("perfect",))
+        assert len({job[3] for job in first}) == 2
+
+    def test_session_is_reproducible(self):
+        job = ("ammo", 1, "perfect", 42)
+        first = balance.run_session(job)
+        assert first == balance.run_session(job)
+        assert first["shots"] == 10
+        assert first["accuracy"] == 1.0
+        assert len(first["kill_seconds"]) == first["hits"]
+        assert DIFFICULTY_LEVEL[0] == 0
+        assert game_clock.simulated is False
+
+    def test_aggregate(self):
+        runs = [{"mode": "time", "difficulty": 2, "bot": "casual",
+                 "score": score, "accuracy": 0.5, "duration": 30.0,
+                 "kill_seconds": [1.0, 3.0]} for score in range(11)]
+        report = balance.aggregate(runs)
+        assert len(report) == 1
+        assert report[0]["runs"] == 11
+        assert report[0]["score"] == {"mean": 5, "p10": 1, "median": 5,
+                                      "p90": 9}
+        assert report[0]["kill_seconds"]["mean"] == 2.0
+        assert "time" in balance.format_report(report)
+
+
+class TestGameplayEngine:
+    @pytest.fixture
+    def manager(self, mocker):
+        mocker.patch('pygame.image.load',
+                     return_value=pygame.Surface((100, 100)))
+        manager = mocker.Mock()
+        manager.scenes = {"score": mocker.Mock(), "pause": mocker.Mock()}
+        return manager
+
+    def click(self, pos):
+        return pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=pos)
+
+    def test_modes_share_the_engine(self, manager):
+        for scene_class, mode in ((GameScene, "game"),
+                                  (LimitedAmmoGameModeScene, "ammo"),
+                                  (LimitedTimeGameModeScene, "time")):
+            scene = scene_class(manager)
+            assert isinstance(scene, GameplayEngine)
+            assert scene.mode == mode
+            assert scene_class.ASSETS == GameplayEngine.ASSETS
+
+    def test_hud_text_comes_from_rules(self, manager):
+        free = GameScene(manager)
+        ammo = LimitedAmmoGameModeScene(manager)
+        timed = LimitedTimeGameModeScene(manager)
+        for scene in (free, ammo, timed):
+            scene.start_time = game_clock.get_ticks() - 2000
+            scene.shots_count = 4
+        assert free.hud_text()[1:3] == ("2.0", "4")
+        assert ammo.hud_text()[1:3] == ("2.0", "10")
+        assert timed.hud_text()[1:3] == ("28.0", "4")
+
+    def test_composed_mode(self, manager):
+        engine = GameplayEngine(manager, "time",
+                                [AmmoLimit(2), TimeLimit(5000)])
+        engine.handle_events([self.click((10, 10))])
+        assert (engine.ammo, engine.shots_count) == (1, 1)
+        assert engine.hud_text()[1:3] == ("5.0", "1")
+        engine.handle_events([self.click((10, 10))])
+        manager.set_scene.assert_called_once_with("score")
+        manager.scenes["score"].set_stats.assert_called_once()
+
+    def test_time_limit_ends_in_update(self, manager):
+        engine = GameplayEngine(manager, "game", [TimeLimit(1000)])
+        engine.start_time -= 1500
+        engine.update()
+        manager.set_scene.assert_called_once_with("score")
+        assert len(engine.ducks) == 0
+
+    def test_pause_reports_stats_in_every_mode(self, manager):
+        scene = LimitedAmmoGameModeScene(manager)
+        escape = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_ESCAPE)
+        scene.handle_events([escape])
+        manager.scenes["score"].set_stats.assert_called_once()
+        assert manager.scenes["pause"].previous_scene_name == "ammo"
+        manager.set_scene.assert_called_once_with("pause")
+
+
+class TestCulling:
+    def test_flock_skips_off_screen_blits(self, mocker):
+        flock = DuckFlock()
+        for x in (-400, 300, 1200):
+            flock.append(Duck(x, 300, 0))
+        before = dict(cull_stats)
+        dirty = flock.draw(pygame.Surface((900, 800)))
+        assert len(dirty) == 1
+        assert cull_stats["drawn"] - before["drawn"] == 1
+        assert cull_stats["culled"] - before["culled"] == 2
+
+    def test_scalar_draw_culls(self):
+        screen = pygame.Surface((900, 800))
+        before = cull_stats["culled"]
+        Duck(-400, 300, 0).draw(screen)
+        Duck(-400, 700, 0).draw(screen)
+        assert cull_stats["culled"] - before == 2
+
+    def test_respawn_waits_until_fully_off_screen(self):
+        flock = DuckFlock()
+        duck = Duck(895, 300, 0, direction="left")
+        flock.append(duck)
+        flock.update()
+        assert flock.base_x[0] > 895
+        assert not duck.gone()
+        flock.base_x[0] = 935
+        flock.update()
+        assert flock.base_x[0] <= 0
+
+
+class CountingSurface(pygame.Surface):
+    def __init__(self, size):
+        super().__init__(size)
+        self.batches = []
+
+    def blits(self, blit_sequence, doreturn=True):
+        blit_sequence = list(blit_sequence)
+        self.batches.append(len(blit_sequence))
+        return super().blits(blit_sequence, doreturn)
+
+
+class TestBatchedBlits:
+    def test_flock_draws_in_one_batch(self):
+        flock = DuckFlock()
+        for x, y in ((100, 100), (850, 300), (400, -50), (-400, 300)):
+            flock.append(Duck(x, y, 0))
+        screen = CountingSurface((900, 800))
+        dirty = flock.draw(screen)
+        assert screen.batches == [3]
+
+        expected = pygame.Surface((900, 800))
+        rects = [expected.blit(duck.image, (duck.x, duck.y))
+                 for duck in flock.ducks[:3]]
+        assert dirty == rects
+        assert screen.get_view("2").raw == expected.get_view("2").raw
+
+    def test_hud_field_stage_matches_draw(self):
+        field = HudField((10, 10), 31, 'white')
+        item, dirty = field.stage("7")
+        assert item == (field.surface, (10, 10))
+        assert dirty == [pygame.Rect((10, 10), field.surface.get_size())]
+        assert field.stage("7")[1] == []
+
+    def test_engine_submits_hud_in_one_batch(self, scene_manager):
+        scene = GameScene(scene_manager)
+        screen = CountingSurface((900, 800))
+        scene.draw(screen)
+        assert screen.batches == [0, 4]
+        scene.score = 5
+        assert scene.score_field.rect in scene.draw(screen)